@@ -8,9 +8,20 @@ import argparse
 import asyncio
 import sys
 import json
+from contextlib import aclosing
 from datetime import datetime
+from simulator.backfill import BackfillLoader
+from simulator.clock import VirtualClock
+from simulator.enhanced_features import HistoricalTracker
 from simulator.otc_simulator import OTCSimulator
 from simulator.config import Config
+from simulator.history_store import HistoryStore
+from simulator.http_session import HTTPSessionPool
+from simulator.price_series import json_default, to_json
+from simulator.price_tape import TapeRecorder
+from simulator.risk_detector import RiskDetector
+from simulator.streaming import BatchAnalyzer
+from simulator.sweep import SweepEngine
 from simulator.logger import setup_logger
 
 def parse_arguments():
@@ -22,7 +33,12 @@ def parse_arguments():
 Examples:
   python main.py --token SOL --amount 100 --delay 2.5
   python main.py --token USDC --amount 50000 --threshold 0.02 --iterations 10
+  python main.py --token SOL --iterations 100 --concurrency 10 --rate-limit 20
   python main.py --config custom_config.json
+  python main.py --token SOL --tape sol_ticks.tape --iterations 100
+  python main.py --token SOL --synthetic jump_diffusion --seed 7 --iterations 100
+  python main.py --synthetic gbm --seed 7 --iterations 20 --sweep grid.json --workers 8
+  python main.py --token SOL --backfill sol_2024.csv --history-store history.db
         """
     )
     
@@ -60,6 +76,100 @@ Examples:
         help='Number of simulation iterations (default: 1)'
     )
     
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Iterations to run at once (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        help='Max price API requests per second shared by all iterations'
+    )
+    
+    parser.add_argument(
+        '--price-fetch-mode',
+        choices=['sequential', 'hedged', 'race'],
+        default='sequential',
+        help='How price providers are queried (default: sequential)'
+    )
+    
+    parser.add_argument(
+        '--tape',
+        type=str,
+        help='Replay prices from a recorded price tape instead of live APIs'
+    )
+    
+    parser.add_argument(
+        '--synthetic',
+        choices=['gbm', 'jump_diffusion', 'regime_switching'],
+        help='Generate synthetic prices with the given model instead of live APIs'
+    )
+    
+    parser.add_argument(
+        '--seed',
+        type=int,
+        help='Random seed for synthetic prices'
+    )
+    
+    parser.add_argument(
+        '--clock',
+        choices=['auto', 'system', 'virtual'],
+        default='auto',
+        help='Simulation clock (default: auto, virtual time for tape/synthetic prices)'
+    )
+    
+    parser.add_argument(
+        '--time-acceleration',
+        type=float,
+        metavar='FACTOR',
+        help='Run virtual time FACTOR times faster than real time instead of instantly'
+    )
+    
+    parser.add_argument(
+        '--monte-carlo',
+        type=int,
+        metavar='PATHS',
+        help='Run a vectorized Monte Carlo risk/MEV estimate over PATHS synthetic trades'
+    )
+    
+    parser.add_argument(
+        '--sweep',
+        type=str,
+        metavar='GRID',
+        help='Sweep a JSON parameter grid, e.g. {"token": ["SOL", "ETH"], "delay": [1, 2]}'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Worker processes for --sweep (default: CPU cores)'
+    )
+    
+    parser.add_argument(
+        '--backfill',
+        type=str,
+        nargs='+',
+        metavar='FILE',
+        help='Load historical CSV/JSONL/tape ticks and replay them through the risk detector'
+    )
+    
+    parser.add_argument(
+        '--record-tape',
+        type=str,
+        metavar='DIR',
+        help='Record every live price tick to tapes in DIR'
+    )
+    
+    parser.add_argument(
+        '--history-store',
+        type=str,
+        metavar='PATH',
+        help='Persist historical ticks to a SQLite database at PATH'
+    )
+    
     parser.add_argument(
         '--config', 
         type=str,
@@ -98,60 +208,147 @@ def load_config(config_path):
         print(f"Error: Invalid JSON in configuration file: {e}")
         sys.exit(1)
 
-async def run_simulation(config):
-    """Run the OTC simulation"""
+def log_result_summary(logger, result):
+    """Log the outcome of one simulation iteration"""
+    if result['risk_detected']:
+        logger.warning(f"RISK DETECTED - MEV Profit: ${result['mev_profit']:.2f}")
+    else:
+        logger.info(f"No risk detected - Price change: {result.get('price_change', 0.0):.4f}%")
+
+class ResultStreamWriter:
+    """Writes the results JSON document incrementally, one result at a time"""
+    
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self._file = open(output_path, 'w')
+        self._file.write('{\n  "results": [')
+        self._count = 0
+    
+    def write(self, result):
+        """Append one simulation result"""
+        self._file.write(',\n    ' if self._count else '\n    ')
+        self._file.write(to_json(result))
+        self._count += 1
+    
+    def close(self, summary):
+        """Write the summary fields after the results and close the file"""
+        self._file.write('\n  ]')
+        for key, value in summary.items():
+            self._file.write(f',\n  {json.dumps(key)}: {to_json(value)}')
+        self._file.write('\n}\n')
+        self._file.close()
+        print(f"Results saved to {self.output_path}")
+
+async def stream_trades(simulator, iterations, logger):
+    """Yield back-to-back single trades"""
+    for iteration in range(iterations):
+        logger.info(f"Running iteration {iteration + 1}/{iterations}")
+        yield await simulator.simulate_otc_trade()
+
+def summarize_run(config, analyzer):
+    """Build the run summary from the streamed result totals"""
+    total_risks = analyzer.risks_detected
+    total_mev = analyzer.total_mev
+    
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'config': config.__dict__,
+        'total_iterations': analyzer.total,
+        'risks_detected': total_risks,
+        'risk_percentage': (total_risks / analyzer.total) * 100 if analyzer.total else 0,
+        'total_mev_profit': total_mev,
+        'average_mev_per_risk': total_mev / total_risks if total_risks > 0 else 0
+    }
+
+async def run_simulation(config, output_path=None):
+    """
+    Run the OTC simulation
+    
+    Results are streamed to ``output_path`` as they complete rather than
+    collected in memory; the returned summary holds only the totals.
+    """
     logger = setup_logger(verbose=config.verbose)
     
     logger.info("Starting OTC Front-Running Defense Simulator")
     logger.info(f"Configuration: {config}")
     
-    simulator = OTCSimulator(config)
-    results = []
+    analyzer = BatchAnalyzer()
+    writer = ResultStreamWriter(output_path) if output_path else None
+    tape_recorder = TapeRecorder.from_config(config)
+    history_store = HistoryStore.from_config(config)
     
     try:
-        for iteration in range(config.iterations):
-            logger.info(f"Running iteration {iteration + 1}/{config.iterations}")
-            
-            result = await simulator.simulate_otc_trade()
-            results.append(result)
+        # One pooled session for every iteration
+        async with HTTPSessionPool(config) as http_pool:
+            simulator = OTCSimulator(config, http_pool, tape_recorder=tape_recorder,
+                                     history_store=history_store)
             
-            # Log result summary
-            if result['risk_detected']:
-                logger.warning(f"RISK DETECTED - MEV Profit: ${result['mev_profit']:.2f}")
+            if config.concurrency > 1:
+                results = simulator.stream_batch_simulation()
             else:
-                logger.info(f"No risk detected - Price change: {result['price_change']:.4f}%")
+                results = stream_trades(simulator, config.iterations, logger)
+            
+            async with aclosing(results):
+                async for result in results:
+                    analyzer.add(result)
+                    log_result_summary(logger, result)
+                    if writer:
+                        writer.write(result)
+            
+            logger.debug(f"HTTP pool stats: {http_pool.get_stats()}")
     
     except KeyboardInterrupt:
         logger.info("Simulation interrupted by user")
     except Exception as e:
         logger.error(f"Simulation error: {e}")
         raise
+    finally:
+        if tape_recorder:
+            tape_recorder.close()
+            logger.info(f"Recorded {tape_recorder.ticks_recorded} ticks to {len(tape_recorder.paths)} tape(s)")
+        if history_store:
+            history_store.close()
+            logger.info(f"Persisted {history_store.ticks_written} ticks to {history_store.path}")
+        if writer:
+            # Closed on failure too, so the output stays a valid document
+            # holding the results streamed so far
+            writer.close(summarize_run(config, analyzer))
     
-    # Generate summary
-    total_risks = sum(1 for r in results if r['risk_detected'])
-    total_mev = sum(r['mev_profit'] for r in results)
+    summary = summarize_run(config, analyzer)
     
-    summary = {
-        'timestamp': datetime.now().isoformat(),
-        'config': config.__dict__,
-        'total_iterations': len(results),
-        'risks_detected': total_risks,
-        'risk_percentage': (total_risks / len(results)) * 100 if results else 0,
-        'total_mev_profit': total_mev,
-        'average_mev_per_risk': total_mev / total_risks if total_risks > 0 else 0,
-        'results': results
-    }
-    
-    logger.info(f"Simulation complete: {total_risks}/{len(results)} risks detected")
-    logger.info(f"Total theoretical MEV profit: ${total_mev:.2f}")
+    logger.info(f"Simulation complete: {summary['risks_detected']}/{analyzer.total} risks detected")
+    logger.info(f"Total theoretical MEV profit: ${summary['total_mev_profit']:.2f}")
     
     return summary
 
+def run_backfill(config, paths):
+    """
+    Load historical tick files into a tracker and replay them through the risk detector
+    
+    The tracker runs on a virtual clock that follows the loaded data, so
+    volatility windows end at the newest tick rather than the wall clock.
+    """
+    history_store = HistoryStore.from_config(config)
+    tracker = HistoricalTracker(config, VirtualClock(start=0.0), history_store)
+    loader = BackfillLoader(tracker, RiskDetector(config))
+    
+    try:
+        files = [loader.load(path, config.token) for path in paths]
+    finally:
+        if history_store:
+            history_store.close()
+    
+    return {
+        'files': files,
+        'replay': loader.replay,
+        'volatility': {token: tracker.calculate_volatility(token) for token in tracker.histories}
+    }
+
 def save_results(results, output_path):
     """Save results to JSON file"""
     try:
         with open(output_path, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+            json.dump(results, f, indent=2, default=json_default)
         print(f"Results saved to {output_path}")
     except Exception as e:
         print(f"Error saving results: {e}")
@@ -171,7 +368,18 @@ async def main():
             delay=args.delay,
             threshold=args.threshold,
             iterations=args.iterations,
-            verbose=args.verbose
+            verbose=args.verbose,
+            concurrency=args.concurrency,
+            rate_limit=args.rate_limit,
+            price_fetch_mode=args.price_fetch_mode,
+            price_source='tape' if args.tape else 'synthetic' if args.synthetic else 'live',
+            price_tape_path=args.tape,
+            synthetic_model=args.synthetic or 'gbm',
+            synthetic_seed=args.seed,
+            clock=args.clock,
+            time_acceleration=args.time_acceleration,
+            record_tape_dir=args.record_tape,
+            history_store_path=args.history_store
         )
     
     # Start web interface if requested
@@ -180,14 +388,72 @@ async def main():
         await start_web_server(config)
         return
     
-    # Run simulation
-    try:
-        results = await run_simulation(config)
+    # Run Monte Carlo estimate if requested
+    if args.monte_carlo:
+        results = OTCSimulator(config).run_monte_carlo_simulation(args.monte_carlo)
+        if args.output:
+            save_results(results, args.output)
+        
+        print("\n" + "="*50)
+        print("MONTE CARLO SUMMARY")
+        print("="*50)
+        print(f"Token: {config.token}")
+        print(f"Amount: {config.amount}")
+        print(f"Delay: {config.delay}s")
+        print(f"Paths: {results['paths']}")
+        print(f"Risk Probability: {results['risk_probability'] * 100:.2f}%")
+        print(f"Mean MEV Profit: ${results['mev_profit']['mean']:.2f}")
+        print(f"MEV VaR 95% / CVaR 95%: ${results['mev_profit']['var_95']:.2f} / "
+              f"${results['mev_profit']['cvar_95']:.2f}")
+        print(f"Execution Time: {results['execution_time']:.2f}s")
+        print("="*50)
+        return
+    
+    # Backfill historical ticks if requested
+    if args.backfill:
+        results = run_backfill(config, args.backfill)
+        if args.output:
+            save_results(results, args.output)
         
-        # Save results if output path specified
+        print("\n" + "="*50)
+        print("BACKFILL SUMMARY")
+        print("="*50)
+        for stats in results['files']:
+            print(f"{stats['path']}: {stats['ticks_loaded']}/{stats['ticks_read']} ticks "
+                  f"({stats['ticks_per_second']:,.0f} ticks/s)")
+        for token, replay in results['replay'].items():
+            print(f"{token}: {replay['data_points']} ticks, {replay['risk_periods']} risk periods "
+                  f"(max move {replay['max_change_pct']:.2f}%), "
+                  f"volatility {results['volatility'][token]:.6f}")
+        print("="*50)
+        return
+    
+    # Run parameter sweep if requested
+    if args.sweep:
+        grid = load_config(args.sweep)
+        results = await asyncio.to_thread(SweepEngine(config, args.workers).run, grid)
         if args.output:
             save_results(results, args.output)
         
+        table = results['table']
+        print("\n" + "="*50)
+        print("PARAMETER SWEEP SUMMARY")
+        print("="*50)
+        print(f"Grid Points: {results['points']}")
+        print(f"Workers: {results['workers']}")
+        for i in range(results['points']):
+            params = ", ".join(f"{name}={table[name][i]}" for name in grid)
+            print(f"{params}: risk {table['risk_percentage'][i]:.1f}%, "
+                  f"MEV ${table['total_mev_profit'][i]:.2f}")
+        print(f"Execution Time: {results['execution_time']:.2f}s")
+        print("="*50)
+        return
+    
+    # Run simulation
+    try:
+        # Results are written to the output file as they complete
+        results = await run_simulation(config, args.output)
+        
         # Print summary to console
         print("\n" + "="*50)
         print("SIMULATION SUMMARY")
@@ -0,0 +1,145 @@
+"""
+Clocks for the simulator: wall-clock time for live runs, virtual time for backtests
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime
+from typing import List, Optional, Protocol, Tuple, runtime_checkable
+
+@runtime_checkable
+class Clock(Protocol):
+    """Time source used by monitoring loops, trackers and alerts"""
+    
+    def time(self) -> float:
+        """Current time as seconds since the epoch"""
+        ...
+    
+    def now(self) -> datetime:
+        """Current time as a datetime"""
+        ...
+    
+    async def sleep(self, seconds: float):
+        """Wait until ``seconds`` have passed on this clock"""
+        ...
+
+class SystemClock:
+    """Wall-clock time with real sleeps"""
+    
+    def time(self) -> float:
+        return time.time()
+    
+    def now(self) -> datetime:
+        return datetime.now()
+    
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+class VirtualClock:
+    """
+    Simulated time that does not wait for the wall clock
+    
+    With no ``speed`` the clock jumps straight to the next wake-up: sleepers
+    are kept in a heap and released in deadline order, so concurrent loops
+    still interleave as they would in real time. With ``speed`` N, virtual
+    time runs N times faster than the wall clock.
+    """
+    
+    # Event loop iterations without a new sleeper before time jumps ahead
+    SETTLE_ITERATIONS = 4
+    
+    def __init__(self, start: Optional[float] = None, speed: Optional[float] = None):
+        """
+        Args:
+            start: Initial virtual time in epoch seconds (defaults to now)
+            speed: Time acceleration factor, or None to advance instantly
+        """
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+        
+        self.speed = speed
+        self._now = time.time() if start is None else start
+        self._anchor = time.monotonic()
+        self._sleepers: List[Tuple[float, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._settle = 0
+        self._advance_pending = False
+    
+    def time(self) -> float:
+        if self.speed is None:
+            return self._now
+        return self._now + (time.monotonic() - self._anchor) * self.speed
+    
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+    
+    async def sleep(self, seconds: float):
+        if self.speed is not None:
+            await asyncio.sleep(max(seconds, 0) / self.speed)
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self._now + max(seconds, 0), next(self._counter), future))
+        self._schedule_advance()
+        await future
+    
+    def advance(self, seconds: float):
+        """Move virtual time forward, waking any sleepers that are due"""
+        self._now += seconds
+        self._release(self._now)
+    
+    def _schedule_advance(self):
+        """Advance once the other ready tasks have had a chance to queue their sleeps"""
+        self._settle = self.SETTLE_ITERATIONS
+        if not self._advance_pending:
+            self._advance_pending = True
+            asyncio.get_running_loop().call_soon(self._advance)
+    
+    def _advance(self):
+        """Jump to the earliest pending deadline and wake everything due by then"""
+        if self._settle > 0:
+            self._settle -= 1
+            asyncio.get_running_loop().call_soon(self._advance)
+            return
+        
+        self._advance_pending = False
+        while self._sleepers and self._sleepers[0][2].done():
+            heapq.heappop(self._sleepers)
+        if not self._sleepers:
+            return
+        
+        self._now = max(self._now, self._sleepers[0][0])
+        self._release(self._now)
+        
+        # Later sleepers are woken once the released tasks have run
+        if self._sleepers:
+            self._schedule_advance()
+    
+    def _release(self, now: float):
+        while self._sleepers and self._sleepers[0][0] <= now:
+            _, _, future = heapq.heappop(self._sleepers)
+            if not future.done():
+                future.set_result(None)
+
+def create_clock(config) -> Clock:
+    """
+    Build the clock selected by the config
+    
+    ``auto`` uses virtual time when prices come from an offline source
+    (tape or synthetic) and the wall clock for live prices.
+    
+    Args:
+        config: Simulator configuration
+    
+    Returns:
+        Clock instance
+    """
+    clock = config.clock
+    if clock == "auto":
+        clock = "system" if config.price_source == "live" else "virtual"
+    
+    if clock == "virtual":
+        return VirtualClock(speed=config.time_acceleration)
+    return SystemClock()
@@ -21,16 +21,62 @@ class Config:
     # Simulation parameters
     iterations: int = 1
     verbose: bool = False
+    concurrency: int = 1  # Batch iterations allowed to run at once
+    stream_buffer_size: int = 16  # Finished results buffered for a slow consumer
+    rate_limit: Optional[float] = None  # Max price API requests per second (None = unlimited)
+    rate_limit_burst: int = 5  # Requests allowed back-to-back before limiting
     
     # API configuration
     jupiter_api_url: str = "https://price.jup.ag/v6"
     jupiter_quote_url: str = "https://quote-api.jup.ag/v6/quote"
     
+    # Price source ('live' APIs, 'tape' replay or 'synthetic' paths)
+    price_source: str = "live"
+    price_tape_path: Optional[str] = None
+    
+    # Simulation clock ('auto' = virtual time for offline price sources)
+    clock: str = "auto"  # 'auto', 'system' or 'virtual'
+    time_acceleration: Optional[float] = None  # Virtual speed-up factor (None = instant)
+    
+    # Synthetic price engine
+    synthetic_model: str = "gbm"  # 'gbm', 'jump_diffusion' or 'regime_switching'
+    synthetic_seed: Optional[int] = None  # Seed for reproducible runs
+    synthetic_dynamics: dict = None  # Per-token TokenDynamics overrides
+    monte_carlo_paths: int = 100000  # Paths per Monte Carlo run
+    
+    # Tape recording of live ticks
+    record_tape_dir: Optional[str] = None  # Directory for recorded tapes (None = off)
+    tape_flush_ticks: int = 4096  # Buffered ticks per bulk write
+    tape_flush_seconds: float = 5.0  # Also write once the oldest buffered tick is this old
+    tape_rotate_bytes: int = 64 * 1024 * 1024  # Start a new tape after this size
+    tape_rotate_seconds: float = 3600.0  # Start a new tape after this long
+    
     # Timing parameters
     quote_interval: float = 0.5  # Seconds between price checks
     max_retries: int = 3
     request_timeout: float = 10.0
     
+    # HTTP connection pool parameters
+    http_pool_size: int = 100  # Total pooled connections
+    http_pool_per_host: int = 20  # Pooled connections per host
+    dns_cache_ttl: int = 300  # Seconds to cache DNS lookups
+    keepalive_timeout: float = 30.0  # Seconds to keep idle connections open
+    
+    # Price request hedging
+    price_fetch_mode: str = "sequential"  # 'sequential', 'hedged' or 'race'
+    price_request_timeout: float = 3.0  # Per-provider price request timeout
+    hedge_delay: Optional[float] = None  # Fixed hedge delay (None = latency percentile)
+    hedge_percentile: float = 0.95  # Primary latency percentile to wait before hedging
+    hedge_min_samples: int = 20  # Samples needed before the percentile is trusted
+    hedge_initial_delay: float = 0.5  # Hedge delay used until then
+    
+    # Price cache parameters
+    price_cache_enabled: bool = True
+    price_cache_ttl: float = 0.25  # Seconds a price stays fresh (below quote_interval)
+    price_cache_ttls: dict = None  # Per-symbol TTL overrides
+    price_cache_stale_ttl: float = 0.0  # Extra seconds a stale price is served while refreshing
+    gas_price_max_age: float = 30.0  # Max age of the SOL price used for gas costs
+    
     # MEV calculation parameters
     gas_cost: float = 0.005  # Estimated transaction cost in SOL
     slippage_tolerance: float = 0.005  # 0.5% slippage tolerance
@@ -41,10 +87,21 @@ class Config:
     # Enhanced features configuration
     enable_alerts: bool = True  # Real-time price alerts
     alert_threshold: float = 0.02  # 2% alert threshold
+    horizon_alerts: list = None  # [threshold, horizon_seconds] rolling-window alerts on the trade token
+    alert_retention_hours: float = 24.0  # Hours triggered alerts are kept in the history
+    alert_history_size: int = 10_000  # Most triggered alerts kept in the history
     custom_delay_periods: list = None  # Custom delay periods to test
     batch_tokens: list = None  # Multiple tokens for batch simulation
     historical_tracking: bool = True  # Track historical patterns
     volatility_window: int = 24  # Hours for volatility tracking
+    history_capacity: int = 1_000_000  # Max ticks kept per token by the historical tracker
+    rollup_resolutions: list = None  # OHLC bar sizes in seconds, used once the ring buffer overwrites a window's ticks
+    rollup_min_bars: int = 120  # Bars a rollup needs in a window before it replaces overwritten raw ticks
+    correlation_window: int = 600  # Aligned multi-token ticks in the rolling correlation window
+    correlation_benchmark: str = "SOL"  # Token betas are measured against
+    history_store_path: Optional[str] = None  # SQLite file persisting tracked ticks (None = off)
+    history_store_batch_size: int = 500  # Pending ticks that trigger a commit
+    history_store_commit_interval: float = 5.0  # Max seconds a tick waits to be committed
     advanced_risk_scoring: bool = True  # Enhanced risk algorithms
     
     def __post_init__(self):
@@ -75,6 +132,18 @@ class Config:
         
         if self.batch_tokens is None:
             self.batch_tokens = ["SOL", "BTC", "ETH", "USDC"]  # Default batch tokens
+        
+        if self.horizon_alerts is None:
+            self.horizon_alerts = [[0.02, 30.0]]  # >2% move within any 30 s window
+        
+        if self.rollup_resolutions is None:
+            self.rollup_resolutions = [1, 60, 300, 3600]  # 1 s, 1 m, 5 m, 1 h bars
+        
+        if self.price_cache_ttls is None:
+            self.price_cache_ttls = {}
+        
+        if self.synthetic_dynamics is None:
+            self.synthetic_dynamics = {}
     
     def get_token_mint(self, token_symbol: str) -> Optional[str]:
         """Get token mint address by symbol"""
@@ -94,9 +163,30 @@ class Config:
         if self.iterations <= 0:
             raise ValueError("Iterations must be positive")
         
+        if self.concurrency <= 0:
+            raise ValueError("Concurrency must be positive")
+        
         if not self.get_token_mint(self.token):
             raise ValueError(f"Unsupported token: {self.token}")
         
+        if self.price_source not in ("live", "tape", "synthetic"):
+            raise ValueError(f"Unsupported price source: {self.price_source}")
+        
+        if self.price_source == "tape" and not self.price_tape_path:
+            raise ValueError("Tape price source requires price_tape_path")
+        
+        if self.clock not in ("auto", "system", "virtual"):
+            raise ValueError(f"Unsupported clock: {self.clock}")
+        
+        if self.time_acceleration is not None and self.time_acceleration <= 0:
+            raise ValueError("Time acceleration must be positive")
+        
+        if self.synthetic_model not in ("gbm", "jump_diffusion", "regime_switching"):
+            raise ValueError(f"Unsupported synthetic model: {self.synthetic_model}")
+        
+        if self.price_fetch_mode not in ("sequential", "hedged", "race"):
+            raise ValueError(f"Unsupported price fetch mode: {self.price_fetch_mode}")
+        
         return True
     
     @classmethod
@@ -108,6 +198,7 @@ class Config:
             delay=float(os.getenv("OTC_DELAY", "2.0")),
             threshold=float(os.getenv("OTC_THRESHOLD", "0.01")),
             iterations=int(os.getenv("OTC_ITERATIONS", "1")),
+            concurrency=int(os.getenv("OTC_CONCURRENCY", "1")),
             verbose=os.getenv("OTC_VERBOSE", "false").lower() == "true"
         )
     
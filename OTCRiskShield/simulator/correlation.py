@@ -0,0 +1,145 @@
+"""
+Incremental rolling covariance and correlation across tokens
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+class RollingCorrelation:
+    """
+    Rolling covariance/correlation of aligned per-token returns
+    
+    Each aligned tick (one price per token, sampled together) adds a return
+    vector to a fixed-size window. A token only has a return on ticks where
+    it was priced on this and the previous tick, so every pair keeps its own
+    running count and sums over the ticks where both tokens have a return.
+    A missing price therefore drops out of the statistics instead of entering
+    them as a zero return. The sums are updated as vectors enter and leave,
+    so a tick costs O(k^2) for k tokens and reading the matrix never rescans
+    the window.
+    """
+    
+    def __init__(self, tokens: Iterable[str], window: int):
+        """
+        Args:
+            tokens: Token symbols, in matrix order
+            window: Aligned returns kept in the window
+        """
+        if window < 2:
+            raise ValueError("window must hold at least two returns")
+        
+        self.tokens = list(dict.fromkeys(token.upper() for token in tokens))
+        self.index = {token: i for i, token in enumerate(self.tokens)}
+        self.window = window
+        
+        k = len(self.tokens)
+        self._returns = np.zeros((window, k))
+        self._observed = np.zeros((window, k))
+        self._next = 0
+        self._count = 0
+        # Per pair (i, j), over the ticks where both have a return:
+        # count, sum of i's returns, sum of i's squared returns, cross products
+        self._pairs = np.zeros((k, k))
+        self._sum = np.zeros((k, k))
+        self._sum_sq = np.zeros((k, k))
+        self._cross = np.zeros((k, k))
+        self._last = np.full(k, np.nan)
+        self._updates = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def add(self, prices: Dict[str, float]):
+        """
+        Fold in one aligned tick
+        
+        Args:
+            prices: Token symbol to price, sampled at the same time
+        """
+        current = np.full(len(self.tokens), np.nan)
+        for token, price in prices.items():
+            i = self.index.get(token.upper())
+            if i is not None and price:
+                current[i] = price
+        
+        with np.errstate(invalid='ignore'):
+            returns = current / self._last - 1.0
+        self._last = current
+        observed = np.isfinite(returns)
+        if not observed.any():
+            return
+        returns = np.where(observed, returns, 0.0)
+        observed = observed.astype(np.float64)
+        
+        if self._count == self.window:
+            self._fold(self._returns[self._next], self._observed[self._next], -1.0)
+        else:
+            self._count += 1
+        
+        self._returns[self._next] = returns
+        self._observed[self._next] = observed
+        self._fold(returns, observed, 1.0)
+        self._next = (self._next + 1) % self.window
+        
+        # Running sums drift as returns come and go; rebuild them now and then
+        self._updates += 1
+        if self._updates >= 4 * self.window:
+            self._resync()
+    
+    def covariance(self) -> np.ndarray:
+        """Sample covariance matrix, each pair over the ticks where both have a return"""
+        n = self._pairs
+        return np.divide(self._cross - self._sum * self._sum.T / np.maximum(n, 1), n - 1,
+                         out=np.zeros_like(self._cross), where=n >= 2)
+    
+    def correlation(self) -> np.ndarray:
+        """Correlation matrix; pairs involving a token with no variance are 0"""
+        covariance = self.covariance()
+        variances = self._pair_variances()
+        scale = np.sqrt(variances * variances.T)
+        correlation = np.divide(covariance, scale, out=np.zeros_like(covariance), where=scale > 0)
+        return np.clip(correlation, -1.0, 1.0)
+    
+    def correlations(self, token: str) -> Dict[str, float]:
+        """Correlation of one token with every other token sharing at least two returns"""
+        i = self.index.get(token.upper())
+        if i is None:
+            return {}
+        row = self.correlation()[i]
+        return {other: float(row[j]) for j, other in enumerate(self.tokens)
+                if j != i and self._pairs[i, j] >= 2}
+    
+    def beta(self, token: str, benchmark: str) -> Optional[float]:
+        """Regression beta of a token's returns on a benchmark's, or None if undefined"""
+        i = self.index.get(token.upper())
+        b = self.index.get(benchmark.upper())
+        if i is None or b is None or self._pairs[i, b] < 2:
+            return None
+        variance = self._pair_variances()[b, i]
+        if variance <= 0:
+            return None
+        return float(self.covariance()[i, b] / variance)
+    
+    def _pair_variances(self) -> np.ndarray:
+        """Entry (i, j) is the variance of i's returns over the ticks shared with j"""
+        n = self._pairs
+        variances = np.divide(self._sum_sq - self._sum ** 2 / np.maximum(n, 1), n - 1,
+                              out=np.zeros_like(self._sum_sq), where=n >= 2)
+        return np.clip(variances, 0.0, None)
+    
+    def _fold(self, returns: np.ndarray, observed: np.ndarray, sign: float):
+        self._pairs += sign * np.outer(observed, observed)
+        self._sum += sign * np.outer(returns, observed)
+        self._sum_sq += sign * np.outer(returns * returns, observed)
+        # Missing returns are stored as 0, so cross products are already pairwise
+        self._cross += sign * np.outer(returns, returns)
+    
+    def _resync(self):
+        returns = self._returns[:self._count]
+        observed = self._observed[:self._count]
+        self._pairs = observed.T @ observed
+        self._sum = returns.T @ observed
+        self._sum_sq = (returns * returns).T @ observed
+        self._cross = returns.T @ returns
+        self._updates = 0
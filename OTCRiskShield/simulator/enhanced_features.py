@@ -8,15 +8,29 @@ Enhanced features for OTC simulator including:
 """
 
 import asyncio
+import bisect
+import math
 import time
 import json
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
-from datetime import datetime, timedelta
-import statistics
+from contextlib import aclosing, asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from dataclasses import dataclass, replace
+from datetime import datetime
 
+import numpy as np
+
+from .clock import Clock, SystemClock, create_clock
 from .config import Config
+from .correlation import RollingCorrelation
+from .history_store import HistoryStore
+from .jupiter_client import JupiterClient
 from .logger import setup_logger
+from .price_provider import monitor_price_changes, monitor_prices_batch
+from .price_series import PriceSeries
+from .rolling import RollingExtremes, RollingVolatility
+from .rollups import MultiResolutionRollup, OHLCRollup, bar_trend, bar_volatility
+from .streaming import stream_as_completed
+from .tick_buffer import TickRingBuffer
 
 @dataclass
 class PriceAlert:
@@ -26,6 +40,7 @@ class PriceAlert:
     direction: str  # 'up' or 'down'
     triggered: bool = False
     timestamp: Optional[datetime] = None
+    horizon_seconds: Optional[float] = None  # Rolling window the move is measured over (None = vs previous price)
 
 @dataclass
 class HistoricalDataPoint:
@@ -39,64 +54,293 @@ class HistoricalDataPoint:
 class HistoricalTracker:
     """Tracks historical price patterns and market data"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, clock: Optional[Clock] = None,
+                 store: Optional[HistoryStore] = None):
         self.config = config
+        self.clock = clock or SystemClock()
         self.logger = setup_logger("historical_tracker", config.verbose)
-        self.price_history: List[HistoricalDataPoint] = []
-        self.volatility_cache = {}
-        
-    def add_price_data(self, token: str, price: float, volume: Optional[float] = None):
-        """Add new price data point"""
-        data_point = HistoricalDataPoint(
-            timestamp=datetime.now(),
-            token=token,
-            price=price,
-            volume=volume
+        # Durable copy of every tick; each token's window is warm-loaded on first use
+        self.store = store
+        # Per-token, time-ordered ring buffers of ticks
+        self.histories: Dict[str, TickRingBuffer] = {}
+        # Per-token OHLC bars at each configured resolution, for long windows
+        self.rollups: Dict[str, MultiResolutionRollup] = {}
+        # Rolling return accumulators per (token, window_hours), fed on every tick
+        self.volatility_accumulators: Dict[Tuple[str, float], RollingVolatility] = {}
+        # Per-token counters bumped on every new tick
+        self.data_versions: Dict[str, int] = {}
+        # (kind, token, window_hours) -> (data version, valid_until, value)
+        self.insight_cache: Dict[Tuple[str, str, float], Tuple[int, float, object]] = {}
+        self.cache_stats = {kind: {"hits": 0, "misses": 0} for kind in ("volatility", "trend", "patterns")}
+        # Co-movement of the batch tokens, fed with aligned multi-token ticks
+        self.correlation = RollingCorrelation(
+            [config.correlation_benchmark, *config.batch_tokens], config.correlation_window
         )
-        self.price_history.append(data_point)
+    
+    @property
+    def price_history(self) -> List[HistoricalDataPoint]:
+        """All tracked points across tokens in time order (built on demand)"""
+        points = []
+        for token, history in self.histories.items():
+            timestamps, prices, volumes = history.window()
+            points.extend(
+                HistoricalDataPoint(
+                    timestamp=datetime.fromtimestamp(ts),
+                    token=token,
+                    price=price,
+                    volume=None if volume != volume else volume
+                )
+                for ts, price, volume in zip(timestamps.tolist(), prices.tolist(), volumes.tolist())
+            )
+        points.sort(key=lambda dp: dp.timestamp)
+        return points
+        
+    def _get_history(self, token: str) -> TickRingBuffer:
+        """Get a token's ring buffer, warm-loading the last window from the store"""
+        history = self.histories.get(token)
+        if history is None:
+            history = self.histories[token] = TickRingBuffer(self.config.history_capacity)
+            rollups = self.rollups[token] = MultiResolutionRollup(self.config.rollup_resolutions)
+            if self.store:
+                # Bounded at now so a clock running behind the store (a backfill
+                # replaying old data) doesn't pick up newer ticks and then reject
+                # its own data as out of order
+                now = self.clock.time()
+                since = now - self.config.volatility_window * 3600
+                timestamps, prices, volumes = self.store.load_range(token, since, np.nextafter(now, np.inf))
+                history.extend(timestamps, prices, volumes)
+                rollups.extend(timestamps, prices)
+                self.logger.debug(f"Warm-loaded {len(history)} {token} ticks from history store")
+        return history
+    
+    def _select_rollup(self, token: str, since: float) -> Optional[OHLCRollup]:
+        """
+        Coarsest rollup that still resolves the window starting at ``since``
+        
+        Returns None while the ring buffer still holds every tick since
+        ``since``, so statistics stay exact unless the buffer has overwritten
+        part of the window.
+        """
+        history = self._get_history(token)
+        if len(history) < history.capacity or history.first_timestamp <= since:
+            return None
+        return self.rollups[token].select(since, self.config.rollup_min_bars)
+    
+    def add_price_data(self, token: str, price: float, volume: Optional[float] = None,
+                       timestamp: Optional[float] = None):
+        """
+        Add new price data point
+        
+        Args:
+            token: Token symbol
+            price: Tick price
+            volume: Tick volume, if known
+            timestamp: When the price was observed (defaults to now)
+        """
+        history = self._get_history(token)
+        
+        # Never step backwards if the wall clock is adjusted
+        now = self.clock.time() if timestamp is None else timestamp
+        if len(history):
+            now = max(now, history.last_timestamp)
+        history.append(now, price, volume)
+        if self.store:
+            self.store.append(token, now, price, volume)
+        
+        rollups = self.rollups[token]
+        rollups.add(now, price)
         
         # Keep only data within volatility window
-        cutoff_time = datetime.now() - timedelta(hours=self.config.volatility_window)
-        self.price_history = [dp for dp in self.price_history if dp.timestamp >= cutoff_time]
+        cutoff = now - self.config.volatility_window * 3600
+        history.drop_before(cutoff)
+        rollups.drop_before(cutoff)
+        
+        for (acc_token, window_hours), accumulator in self.volatility_accumulators.items():
+            if acc_token == token:
+                accumulator.add(now, price)
+                accumulator.evict_before(max(now - window_hours * 3600, history.first_timestamp))
+        self.data_versions[token] = self.data_versions.get(token, 0) + 1
         
         self.logger.debug(f"Added price data: {token} @ ${price}")
     
+    def add_price_batch(self, token: str, timestamps: np.ndarray, prices: np.ndarray,
+                        volumes: Optional[np.ndarray] = None) -> int:
+        """
+        Add a block of historical ticks at once
+        
+        The ticks go straight into the ring buffer and rollups with vectorized
+        copies. Ticks older than the token's newest tick are skipped, and
+        volatility accumulators are rebuilt lazily on the next query.
+        
+        Args:
+            token: Token symbol
+            timestamps: Tick times in epoch seconds
+            prices: Tick prices
+            volumes: Traded volumes (NaN or None where unknown)
+            
+        Returns:
+            Number of ticks added
+        """
+        history = self._get_history(token)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if volumes is not None:
+            volumes = np.asarray(volumes, dtype=np.float64)
+        
+        if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, prices = timestamps[order], prices[order]
+            volumes = None if volumes is None else volumes[order]
+        if len(history) and len(timestamps) and timestamps[0] < history.last_timestamp:
+            keep = int(np.searchsorted(timestamps, history.last_timestamp, side='left'))
+            timestamps, prices = timestamps[keep:], prices[keep:]
+            volumes = None if volumes is None else volumes[keep:]
+        if not len(timestamps):
+            return 0
+        
+        rollups = self.rollups[token]
+        history.extend(timestamps, prices, volumes)
+        rollups.extend(timestamps, prices)
+        if self.store:
+            self.store.append_many(token, timestamps, prices, volumes)
+        
+        cutoff = max(self.clock.time(), history.last_timestamp) - self.config.volatility_window * 3600
+        history.drop_before(cutoff)
+        rollups.drop_before(cutoff)
+        
+        for key in [key for key in self.volatility_accumulators if key[0] == token]:
+            del self.volatility_accumulators[key]
+        self.data_versions[token] = self.data_versions.get(token, 0) + 1
+        
+        self.logger.debug(f"Added {len(timestamps)} {token} ticks in bulk")
+        return len(timestamps)
+    
+    def add_aligned_prices(self, timestamp: float, prices: Dict[str, float]):
+        """
+        Fold one aligned multi-token tick into the rolling correlation matrix
+        
+        Args:
+            timestamp: Time the prices were sampled together
+            prices: Token symbol to price
+        """
+        self.correlation.add(prices)
+    
+    def get_correlations(self, token: str) -> Dict[str, float]:
+        """Rolling return correlation of a token with each other tracked token"""
+        return self.correlation.correlations(token)
+    
+    def get_beta(self, token: str, benchmark: Optional[str] = None) -> Optional[float]:
+        """Rolling beta of a token's returns on the benchmark's (None until defined)"""
+        return self.correlation.beta(token, benchmark or self.config.correlation_benchmark)
+    
+    def get_correlation_matrix(self) -> Dict:
+        """Rolling correlation matrix and betas over the aligned tick window"""
+        matrix = self.correlation.correlation()
+        tokens = self.correlation.tokens
+        return {
+            "tokens": tokens,
+            "samples": len(self.correlation),
+            "correlation": {token: dict(zip(tokens, row.tolist())) for token, row in zip(tokens, matrix)},
+            "beta": {token: self.get_beta(token) for token in tokens}
+        }
+    
+    def get_window(self, token: str, window_hours: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get a token's ticks within the last ``window_hours``
+        
+        Args:
+            token: Token symbol
+            window_hours: Window length in hours
+            
+        Returns:
+            Tuple of (timestamps, prices) arrays, oldest first
+        """
+        history = self._get_history(token)
+        timestamps, prices, _ = history.window(self.clock.time() - window_hours * 3600)
+        return timestamps, prices
+    
+    def _memoized(self, kind: str, token: str, window_hours: float, compute) -> object:
+        """
+        Look up an insight, computing it on a miss
+        
+        Entries are keyed by the token's data version, so they stay valid
+        until the token gets a new tick, or until ``valid_until`` when the
+        oldest point in the window ages out. Hits return the cached object.
+        
+        Args:
+            kind: Insight name ('volatility', 'trend' or 'patterns')
+            token: Token symbol
+            window_hours: Window the insight covers
+            compute: Callable returning (value, valid_until)
+        """
+        key = (kind, token, window_hours)
+        version = self.data_versions.get(token, 0)
+        cached = self.insight_cache.get(key)
+        if cached is not None and cached[0] == version and self.clock.time() < cached[1]:
+            self.cache_stats[kind]["hits"] += 1
+            return cached[2]
+        
+        self.cache_stats[kind]["misses"] += 1
+        value, valid_until = compute()
+        self.insight_cache[key] = (version, valid_until, value)
+        return value
+    
+    def get_cache_stats(self) -> Dict:
+        """Get insight cache hit/miss counters and hit rates per insight kind"""
+        stats = {}
+        for kind, counts in self.cache_stats.items():
+            lookups = counts["hits"] + counts["misses"]
+            stats[kind] = {**counts, "hit_rate": counts["hits"] / lookups if lookups else 0.0}
+        stats["entries"] = len(self.insight_cache)
+        return stats
+    
     def calculate_volatility(self, token: str, window_hours: int = None) -> float:
         """Calculate price volatility for a token"""
         if window_hours is None:
             window_hours = self.config.volatility_window
-            
-        cutoff_time = datetime.now() - timedelta(hours=window_hours)
-        token_data = [dp for dp in self.price_history 
-                     if dp.token == token and dp.timestamp >= cutoff_time]
+        return self._memoized("volatility", token, window_hours,
+                              lambda: self._compute_volatility(token, window_hours))
+    
+    def _compute_volatility(self, token: str, window_hours: float) -> Tuple[float, float]:
+        """Volatility over the window and the time the oldest return leaves it"""
+        key = (token, window_hours)
+        now = self.clock.time()
         
-        if len(token_data) < 2:
-            return 0.0
-            
-        prices = [dp.price for dp in token_data]
-        returns = [(prices[i] - prices[i-1]) / prices[i-1] 
-                  for i in range(1, len(prices))]
+        # Bars only stand in for ticks the ring buffer has already overwritten
+        since = now - window_hours * 3600
+        rollup = self._select_rollup(token, since)
+        if rollup is not None:
+            self.volatility_accumulators.pop(key, None)
+            bars = rollup.window(since)
+            return bar_volatility(bars), bars['starts'][0] + rollup.resolution + window_hours * 3600
         
-        if not returns:
-            return 0.0
-            
-        volatility = statistics.stdev(returns) if len(returns) > 1 else 0.0
-        self.volatility_cache[token] = volatility
+        accumulator = self.volatility_accumulators.get(key)
+        if accumulator is None:
+            timestamps, prices = self.get_window(token, window_hours)
+            accumulator = RollingVolatility.from_ticks(window_hours * 3600, timestamps, prices)
+            self.volatility_accumulators[key] = accumulator
         
-        return volatility
+        return accumulator.volatility(now), accumulator.expires_at()
     
     def get_price_trend(self, token: str, window_hours: int = 1) -> Dict:
         """Analyze price trend over specified window"""
-        cutoff_time = datetime.now() - timedelta(hours=window_hours)
-        token_data = [dp for dp in self.price_history 
-                     if dp.token == token and dp.timestamp >= cutoff_time]
-        
-        if len(token_data) < 2:
-            return {"trend": "insufficient_data", "change": 0.0}
-            
-        token_data.sort(key=lambda x: x.timestamp)
-        initial_price = token_data[0].price
-        final_price = token_data[-1].price
+        return self._memoized("trend", token, window_hours,
+                              lambda: self._compute_price_trend(token, window_hours))
+    
+    def _compute_price_trend(self, token: str, window_hours: float) -> Tuple[Dict, float]:
+        """Trend over the window and the time its first point leaves it"""
+        since = self.clock.time() - window_hours * 3600
+        rollup = self._select_rollup(token, since)
+        if rollup is not None:
+            bars = rollup.window(since)
+            initial_price, final_price, data_points = bar_trend(bars)
+            valid_until = bars['starts'][0] + rollup.resolution + window_hours * 3600
+        else:
+            timestamps, prices = self.get_window(token, window_hours)
+            if len(prices) < 2:
+                return {"trend": "insufficient_data", "change": 0.0}, math.inf
+            initial_price, final_price, data_points = float(prices[0]), float(prices[-1]), len(prices)
+            valid_until = float(timestamps[0]) + window_hours * 3600
         
         price_change = (final_price - initial_price) / initial_price
         
@@ -112,13 +356,21 @@ class HistoricalTracker:
             "change": price_change,
             "initial_price": initial_price,
             "final_price": final_price,
-            "data_points": len(token_data)
-        }
+            "data_points": data_points,
+            "resolution": rollup.resolution if rollup is not None else None
+        }, valid_until
     
     def detect_market_patterns(self, token: str) -> Dict:
         """Detect market patterns and anomalies"""
+        return self._memoized("patterns", token, self.config.volatility_window,
+                              lambda: self._compute_market_patterns(token))
+    
+    def _compute_market_patterns(self, token: str) -> Tuple[Dict, float]:
+        """Patterns from the (memoized) volatility and trend, valid while both are"""
         volatility = self.calculate_volatility(token)
         trend = self.get_price_trend(token)
+        valid_until = min(self.insight_cache[("volatility", token, self.config.volatility_window)][1],
+                          self.insight_cache[("trend", token, 1)][1])
         
         patterns = []
         
@@ -139,7 +391,7 @@ class HistoricalTracker:
             "volatility": volatility,
             "trend_analysis": trend,
             "risk_level": self._assess_pattern_risk(patterns, volatility)
-        }
+        }, valid_until
     
     def _assess_pattern_risk(self, patterns: List[str], volatility: float) -> str:
         """Assess risk level based on detected patterns"""
@@ -150,26 +402,222 @@ class HistoricalTracker:
         else:
             return "low"
 
+class _AlertBook:
+    """
+    Armed alerts of one token and direction, sorted so crossed alerts form a tail
+    
+    Keys are ``-threshold`` for 'up' alerts and ``threshold`` for 'down'
+    alerts, so in both cases every alert crossed by a price change sits at
+    or after one bisect point and can be cut off in O(triggered).
+    """
+    
+    def __init__(self, direction: str):
+        self.direction = direction
+        self.keys: List[float] = []
+        self.alerts: List[PriceAlert] = []
+        self.triggered: List[PriceAlert] = []
+    
+    def _key(self, threshold: float) -> float:
+        return -threshold if self.direction == "up" else threshold
+    
+    def add(self, alert: PriceAlert):
+        key = self._key(alert.threshold)
+        i = bisect.bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.alerts.insert(i, alert)
+    
+    def pop_crossed(self, change: float) -> List[PriceAlert]:
+        """Disarm and return every alert crossed by ``change``"""
+        i = bisect.bisect_left(self.keys, self._key(change))
+        crossed = self.alerts[i:]
+        if crossed:
+            del self.keys[i:]
+            del self.alerts[i:]
+            self.triggered.extend(crossed)
+        return crossed
+    
+    def remove(self, threshold: float) -> int:
+        """Remove armed and triggered alerts at ``threshold``; returns the number removed"""
+        key = self._key(threshold)
+        lo = bisect.bisect_left(self.keys, key)
+        hi = bisect.bisect_right(self.keys, key)
+        del self.keys[lo:hi]
+        del self.alerts[lo:hi]
+        
+        triggered = len(self.triggered)
+        self.triggered = [alert for alert in self.triggered if alert.threshold != threshold]
+        return hi - lo + triggered - len(self.triggered)
+    
+    def reset(self):
+        """Re-arm every triggered alert"""
+        for alert in self.triggered:
+            alert.triggered = False
+        keys = self.keys + [self._key(alert.threshold) for alert in self.triggered]
+        alerts = self.alerts + self.triggered
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.alerts = [alerts[i] for i in order]
+        self.triggered = []
+    
+    def __len__(self) -> int:
+        return len(self.alerts) + len(self.triggered)
+
+class AlertHistory:
+    """
+    Triggered alerts in time order with bounded retention
+    
+    Alerts are stored alongside numeric timestamps, so a window query is a
+    bisect plus a slice (O(log n + k)) and eviction just advances the head.
+    Alerts older than ``retention_hours`` or beyond the newest ``max_size``
+    are dropped as new ones arrive.
+    """
+    
+    def __init__(self, retention_hours: Optional[float] = None, max_size: Optional[int] = None):
+        """
+        Args:
+            retention_hours: Hours an alert is kept (None to keep by count only)
+            max_size: Most alerts kept (None for no limit)
+        """
+        self.retention_hours = retention_hours
+        self.max_size = max_size
+        self.recorded = 0  # Alerts ever appended, including evicted ones
+        self._timestamps: List[float] = []
+        self._alerts: List[Dict] = []
+        self._head = 0
+    
+    def append(self, timestamp: float, alert: Dict):
+        """Record an alert; timestamps earlier than the newest are clamped to keep order"""
+        if len(self) and timestamp < self._timestamps[-1]:
+            timestamp = self._timestamps[-1]
+        self._timestamps.append(timestamp)
+        self._alerts.append(alert)
+        self.recorded += 1
+        
+        if self.max_size is not None and len(self) > self.max_size:
+            self._head = len(self._alerts) - self.max_size
+        self.evict(timestamp)
+    
+    def evict(self, now: float):
+        """Drop alerts past the retention window"""
+        if self.retention_hours is not None:
+            self._head = bisect.bisect_left(self._timestamps, now - self.retention_hours * 3600, lo=self._head)
+        
+        # Compact once the evicted prefix dominates the lists
+        if self._head > 1024 and self._head * 2 > len(self._alerts):
+            del self._timestamps[:self._head]
+            del self._alerts[:self._head]
+            self._head = 0
+    
+    def since(self, timestamp: float) -> List[Dict]:
+        """Alerts at or after ``timestamp``, oldest first"""
+        start = bisect.bisect_left(self._timestamps, timestamp, lo=self._head)
+        return self._alerts[start:]
+    
+    def clear(self):
+        self._timestamps.clear()
+        self._alerts.clear()
+        self._head = 0
+    
+    def __len__(self) -> int:
+        return len(self._alerts) - self._head
+    
+    def __iter__(self):
+        return iter(self._alerts[self._head:])
+    
+    def __getitem__(self, index):
+        return self._alerts[self._head:][index]
+
 class AlertSystem:
     """Real-time price alert system"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, clock: Optional[Clock] = None):
         self.config = config
+        self.clock = clock or SystemClock()
         self.logger = setup_logger("alert_system", config.verbose)
-        self.active_alerts: List[PriceAlert] = []
-        self.alert_history: List[Dict] = []
+        # (token, direction, horizon_seconds) -> alerts sorted by threshold, so a
+        # check bisects straight to the crossed alerts instead of scanning every alert
+        self.books: Dict[Tuple[str, str, Optional[float]], _AlertBook] = {}
+        # Rolling min/max per token and horizon, fed from the tick stream
+        self.horizons: Dict[str, Dict[float, RollingExtremes]] = {}
+        self.alert_history = AlertHistory(config.alert_retention_hours, config.alert_history_size)
+    
+    @property
+    def active_alerts(self) -> List[PriceAlert]:
+        """Every registered alert, armed or triggered (built on demand)"""
+        return [alert for book in self.books.values() for alert in (*book.alerts, *book.triggered)]
         
-    def add_alert(self, token: str, threshold: float, direction: str = "both"):
-        """Add new price alert"""
+    def add_alert(self, token: str, threshold: float, direction: str = "both",
+                  horizon_seconds: Optional[float] = None) -> List[PriceAlert]:
+        """
+        Add new price alert
+        
+        Args:
+            token: Token symbol
+            threshold: Relative move that triggers the alert (positive)
+            direction: 'up', 'down' or 'both'
+            horizon_seconds: Trigger on a move of ``threshold`` within any
+                window this long, evaluated per tick by ``on_prices``
+                (None compares ``check_alerts``' current and previous price)
+        """
+        alerts = []
         if direction in ["up", "both"]:
-            alert = PriceAlert(token=token, threshold=threshold, direction="up")
-            self.active_alerts.append(alert)
+            alerts.append(PriceAlert(token=token, threshold=threshold, direction="up",
+                                     horizon_seconds=horizon_seconds))
             
         if direction in ["down", "both"]:
-            alert = PriceAlert(token=token, threshold=-threshold, direction="down")
-            self.active_alerts.append(alert)
+            alerts.append(PriceAlert(token=token, threshold=-threshold, direction="down",
+                                     horizon_seconds=horizon_seconds))
+        
+        for alert in alerts:
+            key = (token, alert.direction, horizon_seconds)
+            book = self.books.get(key)
+            if book is None:
+                book = self.books[key] = _AlertBook(alert.direction)
+            book.add(alert)
+        
+        if horizon_seconds is not None:
+            horizons = self.horizons.setdefault(token, {})
+            if horizon_seconds not in horizons:
+                horizons[horizon_seconds] = RollingExtremes(horizon_seconds)
+            
+        window = f" within {horizon_seconds:g}s" if horizon_seconds is not None else ""
+        self.logger.info(f"Added alert for {token}: {direction} {threshold*100:.1f}%{window}")
+        return alerts
+    
+    def remove_alert(self, token: str, threshold: float, direction: str = "both",
+                     horizon_seconds: Optional[float] = None) -> int:
+        """
+        Remove alerts registered with ``add_alert``
+        
+        Args:
+            token: Token symbol
+            threshold: Threshold the alerts were added with (positive)
+            direction: 'up', 'down' or 'both'
+            horizon_seconds: Horizon the alerts were added with
             
-        self.logger.info(f"Added alert for {token}: {direction} {threshold*100:.1f}%")
+        Returns:
+            Number of alerts removed
+        """
+        removed = 0
+        for side, side_threshold in (("up", threshold), ("down", -threshold)):
+            key = (token, side, horizon_seconds)
+            book = self.books.get(key)
+            if direction in (side, "both") and book is not None:
+                removed += book.remove(side_threshold)
+                if not len(book):
+                    del self.books[key]
+        
+        # Stop tracking a horizon once no alert uses it
+        horizons = self.horizons.get(token, {})
+        if (horizon_seconds in horizons and (token, "up", horizon_seconds) not in self.books
+                and (token, "down", horizon_seconds) not in self.books):
+            del horizons[horizon_seconds]
+            if not horizons:
+                del self.horizons[token]
+        
+        if removed:
+            self.logger.info(f"Removed {removed} alert(s) for {token}: {direction} {threshold*100:.1f}%")
+        return removed
     
     def check_alerts(self, token: str, current_price: float, previous_price: float):
         """Check if any alerts should be triggered"""
@@ -177,25 +625,49 @@ class AlertSystem:
             return
             
         price_change = (current_price - previous_price) / previous_price
+        self._check_books(token, None, price_change, price_change, current_price, self.clock.time())
+    
+    def on_prices(self, timestamp: float, prices: Dict[str, float]):
+        """
+        Evaluate rolling-horizon alerts against one tick of prices
         
-        for alert in self.active_alerts:
-            if alert.token != token or alert.triggered:
+        Each horizon keeps monotonic min/max deques, so a tick costs O(1)
+        amortized per horizon plus a bisect per alert book. The rise from the
+        window's low and the fall from its high to the current price are
+        checked, which catches any move of the threshold within the horizon
+        at the tick that completes it. Matches the monitor loops' ``on_tick``
+        callback signature.
+        
+        Args:
+            timestamp: Tick time in epoch seconds
+            prices: Token symbol to price
+        """
+        for token, price in prices.items():
+            horizons = self.horizons.get(token)
+            if not horizons or not price:
                 continue
-                
-            should_trigger = False
-            
-            if alert.direction == "up" and price_change >= alert.threshold:
-                should_trigger = True
-            elif alert.direction == "down" and price_change <= alert.threshold:
-                should_trigger = True
-                
-            if should_trigger:
-                self._trigger_alert(alert, current_price, price_change)
+            for horizon_seconds, extremes in horizons.items():
+                extremes.add(timestamp, price)
+                self._check_books(token, horizon_seconds, price / extremes.min - 1,
+                                  price / extremes.max - 1, price, timestamp)
+    
+    def _check_books(self, token: str, horizon_seconds: Optional[float], rise: float,
+                     fall: float, price: float, timestamp: float):
+        """Trigger the alerts crossed by a rise (up book) and a fall (down book)"""
+        for direction, change in (("up", rise), ("down", fall)):
+            book = self.books.get((token, direction, horizon_seconds))
+            if book is None:
+                continue
+            for alert in book.pop_crossed(change):
+                self._trigger_alert(alert, price, change, timestamp)
     
-    def _trigger_alert(self, alert: PriceAlert, price: float, change: float):
+    def _trigger_alert(self, alert: PriceAlert, price: float, change: float,
+                       timestamp: Optional[float] = None):
         """Trigger an alert"""
+        if timestamp is None:
+            timestamp = self.clock.time()
         alert.triggered = True
-        alert.timestamp = datetime.now()
+        alert.timestamp = datetime.fromtimestamp(timestamp)
         
         alert_data = {
             "token": alert.token,
@@ -206,25 +678,23 @@ class AlertSystem:
             "timestamp": alert.timestamp.isoformat(),
             "severity": "high" if abs(change) > 0.05 else "medium"
         }
+        if alert.horizon_seconds is not None:
+            alert_data["horizon_seconds"] = alert.horizon_seconds
         
-        self.alert_history.append(alert_data)
+        self.alert_history.append(timestamp, alert_data)
         self.logger.warning(f"ALERT: {alert.token} {alert.direction} {change*100:.2f}% @ ${price}")
         
     def get_recent_alerts(self, hours: int = 24) -> List[Dict]:
         """Get recent alerts within specified timeframe"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        return [alert for alert in self.alert_history 
-                if datetime.fromisoformat(alert["timestamp"]) >= cutoff_time]
+        now = self.clock.time()
+        self.alert_history.evict(now)
+        return self.alert_history.since(now - hours * 3600)
     
     def reset_alerts(self, token: str = None):
         """Reset triggered alerts"""
-        if token:
-            for alert in self.active_alerts:
-                if alert.token == token:
-                    alert.triggered = False
-        else:
-            for alert in self.active_alerts:
-                alert.triggered = False
+        for (book_token, _, _), book in self.books.items():
+            if token is None or book_token == token:
+                book.reset()
 
 class AdvancedRiskScorer:
     """Advanced risk scoring algorithms"""
@@ -233,9 +703,13 @@ class AdvancedRiskScorer:
         self.config = config
         self.logger = setup_logger("risk_scorer", config.verbose)
         
+    # Largest relative boost co-moving markets can add to the composite score
+    CONTAGION_WEIGHT = 0.25
+    
     def calculate_advanced_risk_score(self, token: str, trade_amount: float, 
                                     price_change: float, volatility: float,
-                                    market_patterns: List[str]) -> Dict:
+                                    market_patterns: List[str],
+                                    correlations: Optional[Dict[str, float]] = None) -> Dict:
         """Calculate advanced risk score with multiple factors"""
         
         # Base risk from price change
@@ -250,6 +724,9 @@ class AdvancedRiskScorer:
         # Pattern-based risk
         pattern_risk = self._calculate_pattern_risk(market_patterns)
         
+        # Contagion risk from co-movement with the other tracked tokens
+        contagion_risk = self._calculate_contagion_risk(correlations)
+        
         # Weighted composite score
         weights = {
             "price": 0.4,
@@ -264,6 +741,8 @@ class AdvancedRiskScorer:
             size_risk * weights["size"] +
             pattern_risk * weights["pattern"]
         )
+        # Moves on a leg that co-moves with others are easier to anticipate and spread
+        composite_score = min(composite_score * (1 + self.CONTAGION_WEIGHT * contagion_risk), 1.0)
         
         return {
             "composite_score": composite_score,
@@ -272,7 +751,8 @@ class AdvancedRiskScorer:
                 "price_risk": price_risk,
                 "volatility_risk": volatility_risk,
                 "size_risk": size_risk,
-                "pattern_risk": pattern_risk
+                "pattern_risk": pattern_risk,
+                "contagion_risk": contagion_risk
             },
             "recommendations": self._generate_recommendations(composite_score, market_patterns)
         }
@@ -292,6 +772,12 @@ class AdvancedRiskScorer:
             
         return min(total_risk, 1.0)
     
+    def _calculate_contagion_risk(self, correlations: Optional[Dict[str, float]]) -> float:
+        """Calculate risk from the mean absolute correlation with other tokens"""
+        if not correlations:
+            return 0.0
+        return min(sum(abs(rho) for rho in correlations.values()) / len(correlations), 1.0)
+    
     def _score_to_level(self, score: float) -> str:
         """Convert numeric score to risk level"""
         if score >= 0.7:
@@ -323,70 +809,245 @@ class AdvancedRiskScorer:
 class BatchSimulator:
     """Run simulations across multiple tokens and delay periods"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, http_pool=None, price_cache=None, price_provider=None,
+                 tape_recorder=None, rate_limiter=None, clock: Optional[Clock] = None,
+                 history_store: Optional[HistoryStore] = None,
+                 historical_tracker: Optional[HistoricalTracker] = None):
         self.config = config
         self.logger = setup_logger("batch_simulator", config.verbose)
+        self.clock = clock or create_clock(config)
+        self.history_store = history_store
+        # Shared by the per-token simulators so cross-token statistics see every leg
+        self.historical_tracker = historical_tracker
+        self.http_pool = http_pool
+        self.price_cache = price_cache
+        self.price_provider = price_provider
+        self.tape_recorder = tape_recorder
+        self.rate_limiter = rate_limiter
         
-    async def run_multi_token_simulation(self, jupiter_client) -> Dict:
-        """Run simulation across multiple tokens"""
-        results = {}
+    @asynccontextmanager
+    async def open_price_provider(self, price_provider=None):
+        """Yield the given or injected provider, or a live Jupiter client for the batch"""
+        price_provider = price_provider or self.price_provider
+        if price_provider is not None:
+            yield price_provider
+            return
         
-        for token in self.config.batch_tokens:
-            self.logger.info(f"Running simulation for {token}")
+        session = await self.http_pool.get_session() if self.http_pool else None
+        async with JupiterClient(self.config, session=session, price_cache=self.price_cache,
+                                 tape_recorder=self.tape_recorder,
+                                 rate_limiter=self.rate_limiter) as jupiter:
+            yield jupiter
+    
+    async def stream_multi_token_simulation(self, jupiter_client) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Run simulation across multiple tokens, yielding each token's result as it completes
+        
+        All tokens share one monitoring window: prices are fetched as a
+        batch on every tick, then each token's risk and MEV are evaluated
+        concurrently, so wall time is about one delay period.
+        
+        Args:
+            jupiter_client: Price provider to poll (a shared client is opened if None)
             
-            # Create temporary config for this token
-            token_config = Config(
-                token=token,
-                amount=self.config.amount,
-                delay=self.config.delay,
-                threshold=self.config.threshold,
-                iterations=1
-            )
+        Yields:
+            (token, result) pairs in completion order
+        """
+        # Import here to avoid circular imports
+        from .otc_simulator import OTCSimulator
+        
+        simulators = {}
+        
+        for token in self.config.batch_tokens:
+            # Per-token copy of the batch config, so alert, rollup and
+            # correlation settings carry over
+            token_config = replace(self.config, token=token, iterations=1)
             
             try:
-                # Import here to avoid circular imports
-                from .otc_simulator import OTCSimulator
-                
-                simulator = OTCSimulator(token_config)
-                token_result = await simulator.simulate_otc_trade()
-                results[token] = token_result
-                
+                simulators[token] = OTCSimulator(token_config, self.http_pool, self.price_cache,
+                                                 self.price_provider, self.tape_recorder,
+                                                 self.rate_limiter, self.clock,
+                                                 self.history_store, self.historical_tracker)
             except Exception as e:
                 self.logger.error(f"Simulation failed for {token}: {e}")
-                results[token] = {"error": str(e)}
+                yield token, {"error": str(e)}
+        
+        start_time = self.clock.now()
+        self.logger.info(f"Running simulation for {', '.join(simulators)}")
+        
+        async with self.open_price_provider(jupiter_client) as provider:
+            monitored = {}
+            try:
+                # Step 1: Initial quotes for every token (OTC order placement)
+                initial_prices = await provider.get_token_prices(list(simulators))
+                for token, simulator in simulators.items():
+                    if initial_prices.get(token) is not None and simulator.historical_tracker:
+                        simulator.historical_tracker.add_price_data(token, initial_prices[token])
                 
+                # Step 2: One shared monitoring window for all tokens
+                tokens = [token for token in simulators if initial_prices.get(token) is not None]
+                def on_tick(timestamp: float, prices: Dict[str, float]):
+                    if self.historical_tracker:
+                        self.historical_tracker.add_aligned_prices(timestamp, prices)
+                    # Each token's horizon alerts live on its own simulator
+                    for token, price in prices.items():
+                        alert_system = simulators[token].alert_system
+                        if alert_system:
+                            alert_system.on_prices(timestamp, {token: price})
+                
+                monitored = await monitor_prices_batch(
+                    provider, tokens, self.config.delay, self.config.quote_interval, self.clock, on_tick
+                )
+            except Exception as e:
+                self.logger.error(f"Batch price monitoring failed: {e}")
+            
+            for token, simulator in simulators.items():
+                if token not in monitored:
+                    yield token, simulator.error_result(
+                        start_time, ValueError(f"Could not get initial price for {token}")
+                    )
+            
+            # Step 3: Evaluate each token's risk and MEV
+            def make_evaluation(token: str, final_price: float, price_history: PriceSeries):
+                async def evaluate() -> Tuple[str, Dict]:
+                    simulator = simulators[token]
+                    try:
+                        return token, await simulator.evaluate_trade(
+                            provider, start_time, initial_prices[token], final_price, price_history
+                        )
+                    except Exception as e:
+                        return token, simulator.error_result(start_time, e)
+                return evaluate
+            
+            jobs = [make_evaluation(token, final_price, price_history)
+                    for token, (_, final_price, price_history) in monitored.items()]
+            async with aclosing(stream_as_completed(jobs, len(jobs),
+                                                   self.config.stream_buffer_size)) as results:
+                async for token_result in results:
+                    yield token_result
+    
+    async def run_multi_token_simulation(self, jupiter_client) -> Dict:
+        """
+        Run simulation across multiple tokens
+        
+        Args:
+            jupiter_client: Price provider to poll (a shared client is opened if None)
+            
+        Returns:
+            Per-token results and a summary
+        """
+        results = {token: result async for token, result
+                   in self.stream_multi_token_simulation(jupiter_client)}
+        
+        # Keep the configured token order
+        results = {token: results[token] for token in self.config.batch_tokens if token in results}
+        
         return {
             "multi_token_results": results,
             "summary": self._analyze_multi_token_results(results)
         }
     
     async def run_multi_delay_simulation(self, token: str, jupiter_client) -> Dict:
-        """Run simulation with different delay periods"""
+        """
+        Run simulation with different delay periods
+        
+        The token is monitored once for the longest delay; every shorter
+        delay is sliced from that same price path, so all delays see the
+        same market and the sweep takes max(delay) wall time.
+        
+        Args:
+            token: Token to simulate
+            jupiter_client: Price provider to poll (a shared client is opened if None)
+            
+        Returns:
+            Per-delay results and a summary
+        """
+        # Import here to avoid circular imports
+        from .otc_simulator import OTCSimulator
+        
         results = {}
+        simulators = {}
         
         for delay in self.config.custom_delay_periods:
-            self.logger.info(f"Running simulation with {delay}s delay")
-            
-            # Create temporary config with custom delay
-            delay_config = Config(
-                token=token,
-                amount=self.config.amount,
-                delay=delay,
-                threshold=self.config.threshold,
-                iterations=1
-            )
+            # Per-delay copy of the batch config
+            delay_config = replace(self.config, token=token, delay=delay, iterations=1)
             
             try:
-                from .otc_simulator import OTCSimulator
-                
-                simulator = OTCSimulator(delay_config)
-                delay_result = await simulator.simulate_otc_trade()
-                results[f"{delay}s"] = delay_result
-                
+                simulators[delay] = OTCSimulator(delay_config, self.http_pool, self.price_cache,
+                                                 self.price_provider, self.tape_recorder,
+                                                 self.rate_limiter, self.clock,
+                                                 self.history_store, self.historical_tracker)
             except Exception as e:
                 self.logger.error(f"Simulation failed for {delay}s delay: {e}")
                 results[f"{delay}s"] = {"error": str(e)}
+        
+        if not simulators:
+            return {
+                "multi_delay_results": results,
+                "summary": self._analyze_multi_delay_results(results)
+            }
+        
+        start_time = self.clock.now()
+        max_delay = max(simulators)
+        self.logger.info(f"Monitoring {token} for {max_delay}s to cover delays "
+                         f"{', '.join(f'{delay}s' for delay in simulators)}")
+        
+        # Each delay's alerts only see the ticks of its own window, which
+        # ends at the tick completing the delay as in PriceSeries.window
+        window_start = None
+        watching = {delay: simulator for delay, simulator in simulators.items()
+                    if simulator.alert_system}
+        
+        def on_tick(timestamp: float, prices: Dict[str, float]):
+            nonlocal window_start
+            if window_start is None:
+                window_start = timestamp
+            for delay, simulator in list(watching.items()):
+                simulator.alert_system.on_prices(timestamp, prices)
+                if timestamp - window_start >= delay:
+                    del watching[delay]
+        
+        async with self.open_price_provider(jupiter_client) as provider:
+            try:
+                # One monitoring window as long as the largest delay
+                initial_price, _, price_history = await monitor_price_changes(
+                    provider, token, max_delay, self.config.quote_interval, self.clock, on_tick
+                )
+            except Exception as e:
+                for delay, simulator in simulators.items():
+                    results[f"{delay}s"] = simulator.error_result(start_time, e)
+                price_history = None
+            
+            if price_history is not None:
+                # The delays share the batch's tracker and one window, so the
+                # window's first and last ticks are recorded once rather than per
+                # delay; without a batch tracker nothing is recorded
+                if self.historical_tracker:
+                    timestamps = price_history.timestamps / 1e9
+                    self.historical_tracker.add_price_data(token, initial_price,
+                                                           timestamp=float(timestamps[0]))
+                    self.historical_tracker.add_price_data(token, price_history.last_price,
+                                                           timestamp=float(timestamps[-1]))
+                
+                # Slice each delay's window from the shared tape
+                windows = {delay: price_history.window(delay) for delay in simulators}
+                evaluations = await asyncio.gather(*(
+                    simulators[delay].evaluate_trade(
+                        provider, start_time, initial_price, window.last_price, window,
+                        track_final_price=False
+                    )
+                    for delay, window in windows.items()
+                ), return_exceptions=True)
                 
+                for delay, evaluation in zip(windows, evaluations):
+                    if isinstance(evaluation, Exception):
+                        evaluation = simulators[delay].error_result(start_time, evaluation)
+                    results[f"{delay}s"] = evaluation
+        
+        # Keep the configured delay order
+        results = {f"{delay}s": results[f"{delay}s"] for delay in self.config.custom_delay_periods
+                   if f"{delay}s" in results}
+        
         return {
             "multi_delay_results": results,
             "summary": self._analyze_multi_delay_results(results)
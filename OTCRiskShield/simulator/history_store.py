@@ -0,0 +1,155 @@
+"""
+Durable SQLite time-series store for historical price ticks
+"""
+
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticks (
+    token TEXT NOT NULL,
+    ts REAL NOT NULL,
+    price REAL NOT NULL,
+    volume REAL
+);
+CREATE INDEX IF NOT EXISTS ticks_token_ts ON ticks (token, ts);
+"""
+
+class HistoryStore:
+    """
+    Append-mostly tick store backed by SQLite in WAL mode
+    
+    Ticks are buffered and written in one transaction per batch, either once
+    ``batch_size`` ticks are pending or ``commit_interval`` seconds after the
+    last commit. Range queries go through the (token, ts) index.
+    """
+    
+    def __init__(self, path: str, batch_size: int = 500, commit_interval: float = 5.0):
+        """
+        Args:
+            path: SQLite database file
+            batch_size: Pending ticks that trigger a commit
+            commit_interval: Max seconds a tick waits before being committed
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self.ticks_written = 0
+        
+        self._conn = sqlite3.connect(path, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        
+        self._pending: List[Tuple[str, float, float, Optional[float]]] = []
+        self._last_commit = time.monotonic()
+    
+    @classmethod
+    def from_config(cls, config: Config) -> Optional['HistoryStore']:
+        """Open the configured store, or return None if persistence is off"""
+        if not config.history_store_path:
+            return None
+        return cls(
+            config.history_store_path,
+            batch_size=config.history_store_batch_size,
+            commit_interval=config.history_store_commit_interval
+        )
+    
+    def append(self, token: str, timestamp: float, price: float, volume: Optional[float] = None):
+        """Queue a tick, committing the batch when it is due"""
+        self._pending.append((token, timestamp, price, volume))
+        if (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_commit >= self.commit_interval):
+            self.flush()
+    
+    def append_many(self, token: str, timestamps: np.ndarray, prices: np.ndarray,
+                    volumes: Optional[np.ndarray] = None):
+        """Write a block of ticks in one transaction, bypassing the pending batch"""
+        self.flush()
+        volumes = [None] * len(prices) if volumes is None else [
+            None if volume != volume else volume for volume in np.asarray(volumes).tolist()
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO ticks (token, ts, price, volume) VALUES (?, ?, ?, ?)",
+                zip([token] * len(prices), np.asarray(timestamps).tolist(),
+                    np.asarray(prices).tolist(), volumes)
+            )
+        self.ticks_written += len(prices)
+    
+    def flush(self):
+        """Write all pending ticks in one transaction"""
+        if self._pending:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO ticks (token, ts, price, volume) VALUES (?, ?, ?, ?)",
+                    self._pending
+                )
+            self.ticks_written += len(self._pending)
+            self._pending.clear()
+        self._last_commit = time.monotonic()
+    
+    def load_range(self, token: str, start: Optional[float] = None,
+                   end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Load a token's ticks with start <= ts < end, oldest first
+        
+        Args:
+            token: Token symbol
+            start: Range start in epoch seconds (None for the earliest tick)
+            end: Range end in epoch seconds (None for the latest tick)
+        
+        Returns:
+            Tuple of (timestamps, prices, volumes) arrays; volumes are NaN where unknown
+        """
+        # Pending ticks must be visible to readers
+        self.flush()
+        
+        rows = self._conn.execute(
+            "SELECT ts, price, volume FROM ticks WHERE token = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (token, -np.inf if start is None else start, np.inf if end is None else end)
+        ).fetchall()
+        
+        data = np.array(rows, dtype=np.float64).reshape(-1, 3)
+        return data[:, 0], data[:, 1], data[:, 2]
+    
+    def tokens(self) -> List[str]:
+        """Tokens with at least one stored tick"""
+        self.flush()
+        return [row[0] for row in self._conn.execute("SELECT DISTINCT token FROM ticks")]
+    
+    def delete_before(self, timestamp: float) -> int:
+        """Delete ticks older than ``timestamp``; returns the number removed"""
+        self.flush()
+        with self._conn:
+            cursor = self._conn.execute("DELETE FROM ticks WHERE ts < ?", (timestamp,))
+        return cursor.rowcount
+    
+    def get_stats(self) -> Dict:
+        """Store size and write counters"""
+        count = self._conn.execute("SELECT COUNT(*) FROM ticks").fetchone()[0]
+        return {
+            "path": self.path,
+            "stored_ticks": count,
+            "pending_ticks": len(self._pending),
+            "ticks_written": self.ticks_written
+        }
+    
+    def close(self):
+        """Commit pending ticks and close the database"""
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,110 @@
+"""
+Shared HTTP session pool for price and quote requests
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+import aiohttp
+
+from .config import Config
+
+class HTTPSessionPool:
+    """Long-lived aiohttp session with a bounded, keep-alive connection pool"""
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+        self.stats = {
+            'requests_started': 0,
+            'requests_completed': 0,
+            'requests_failed': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0
+        }
+    
+    async def __aenter__(self):
+        """Async context manager entry"""
+        await self.get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit"""
+        await self.close()
+    
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the shared session, creating it on first use
+        
+        Returns:
+            Open aiohttp session backed by the pooled connector
+        """
+        if self.session is None or self.session.closed:
+            async with self._lock:
+                if self.session is None or self.session.closed:
+                    self.session = self._create_session()
+        return self.session
+    
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a session with pooling, keep-alive and DNS caching enabled"""
+        connector = aiohttp.TCPConnector(
+            limit=self.config.http_pool_size,
+            limit_per_host=self.config.http_pool_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.config.dns_cache_ttl,
+            keepalive_timeout=self.config.keepalive_timeout
+        )
+        
+        self.logger.info(f"Opening shared HTTP session "
+                         f"(pool={self.config.http_pool_size}, "
+                         f"per_host={self.config.http_pool_per_host})")
+        
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.request_timeout),
+            trace_configs=[self._create_trace_config()]
+        )
+    
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        """Count requests, connection reuse and DNS cache usage"""
+        trace_config = aiohttp.TraceConfig()
+        
+        def counter(key):
+            async def on_event(session, context, params):
+                self.stats[key] += 1
+            return on_event
+        
+        trace_config.on_request_start.append(counter('requests_started'))
+        trace_config.on_request_end.append(counter('requests_completed'))
+        trace_config.on_request_exception.append(counter('requests_failed'))
+        trace_config.on_connection_create_end.append(counter('connections_created'))
+        trace_config.on_connection_reuseconn.append(counter('connections_reused'))
+        trace_config.on_dns_cache_hit.append(counter('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(counter('dns_cache_misses'))
+        
+        return trace_config
+    
+    async def close(self):
+        """Close the shared session and release pooled connections"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+            self.logger.info("Shared HTTP session closed")
+        self.session = None
+    
+    def get_stats(self) -> Dict:
+        """Get connection pool statistics"""
+        in_flight = (self.stats['requests_started'] - self.stats['requests_completed']
+                     - self.stats['requests_failed'])
+        
+        return {
+            'open': self.session is not None and not self.session.closed,
+            'pool_size': self.config.http_pool_size,
+            'pool_per_host': self.config.http_pool_per_host,
+            'in_flight_requests': in_flight,
+            **self.stats
+        }
@@ -5,86 +5,324 @@ Jupiter API client for fetching real-time price quotes
 import asyncio
 import aiohttp
 import logging
-from typing import Dict, Optional, Tuple
-from datetime import datetime
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
 from .config import Config
+from .latency import ProviderLatencyTracker
+from .price_cache import PriceCache
+from .price_provider import monitor_price_changes
+from .price_series import PriceSeries
+from .price_tape import TapeRecorder
+from .rate_limiter import AsyncRateLimiter
+
+# Latency histograms outlive individual clients so hedge delays keep learning
+_shared_latency_tracker = ProviderLatencyTracker()
 
 class JupiterClient:
     """Client for interacting with Jupiter API"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, session: Optional[aiohttp.ClientSession] = None,
+                 latency_tracker: Optional[ProviderLatencyTracker] = None,
+                 price_cache: Optional[PriceCache] = None,
+                 tape_recorder: Optional[TapeRecorder] = None,
+                 rate_limiter: Optional[AsyncRateLimiter] = None):
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        self.latency_tracker = latency_tracker or _shared_latency_tracker
+        
+        if price_cache is None and config.price_cache_enabled:
+            price_cache = PriceCache.from_config(config)
+        self.price_cache = price_cache
+        self.tape_recorder = tape_recorder
+        self.rate_limiter = rate_limiter
+        
+        # Price providers in fallback order
+        self._providers = {
+            'cryptocompare': self._fetch_cryptocompare_prices,
+            'coingecko': self._fetch_coingecko_prices
+        }
+        
+        # Single-symbol lookups waiting to be coalesced into one batch
+        self._pending_prices: Dict[str, asyncio.Future] = {}
+        self._flush_scheduled = False
+        self._flush_tasks = set()
     
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.config.request_timeout)
-        )
+        if self._owns_session:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.config.request_timeout)
+            )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
+        # Injected sessions are shared and closed by their owner
+        if self._owns_session and self.session:
             await self.session.close()
     
-    async def get_token_price(self, token_symbol: str) -> Optional[float]:
+    async def get_token_price(self, token_symbol: str,
+                              max_age: Optional[float] = None) -> Optional[float]:
         """
         Get current token price in USD using real-time APIs with fallback
         
+        Prices are served from the price cache while fresh. Concurrent calls
+        made in the same event-loop tick are coalesced into a single batched
+        request (see get_token_prices).
+        
         Args:
             token_symbol: Token symbol (e.g., 'SOL', 'USDC')
+            max_age: Accept a cached price up to this many seconds old
             
         Returns:
             Token price in USD or None if failed
         """
-        # Try CryptoCompare API for real-time prices
+        if self.price_cache is not None:
+            return await self.price_cache.get(token_symbol, self._queue_price_lookups, max_age)
+        
+        return await self._queue_price_lookup(token_symbol)
+    
+    async def _queue_price_lookups(self, symbols: List[str]) -> Dict[str, Optional[float]]:
+        """Queue several symbols for the next batched request"""
+        prices = await asyncio.gather(*(self._queue_price_lookup(symbol) for symbol in symbols))
+        return dict(zip(symbols, prices))
+    
+    async def _queue_price_lookup(self, token_symbol: str) -> Optional[float]:
+        """Queue a symbol for the batched request flushed at the end of this tick"""
+        loop = asyncio.get_running_loop()
+        
+        future = self._pending_prices.get(token_symbol)
+        if future is None:
+            future = loop.create_future()
+            self._pending_prices[token_symbol] = future
+        
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._schedule_pending_flush)
+        
+        # Shield so one cancelled caller does not cancel the shared lookup
+        return await asyncio.shield(future)
+    
+    def _schedule_pending_flush(self):
+        """Start a batched fetch for every symbol queued during this tick"""
+        self._flush_scheduled = False
+        pending, self._pending_prices = self._pending_prices, {}
+        if pending:
+            task = asyncio.ensure_future(self._flush_pending_prices(pending))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _flush_pending_prices(self, pending: Dict[str, asyncio.Future]):
+        """Resolve queued single-symbol lookups from one batched request"""
+        try:
+            prices = await self._fetch_prices(list(pending))
+        except Exception as e:
+            self.logger.error(f"Batched price fetch failed: {e}")
+            prices = {}
+        
+        for symbol, future in pending.items():
+            if not future.done():
+                future.set_result(prices.get(symbol))
+    
+    async def get_token_prices(self, symbols: Iterable[str]) -> Dict[str, Optional[float]]:
+        """
+        Get current USD prices for several tokens in as few requests as possible
+        
+        Uses CryptoCompare's multi-symbol endpoint first and asks CoinGecko
+        for the symbols it could not price. In 'hedged' mode CoinGecko is
+        also asked once CryptoCompare is slower than its hedge delay, and in
+        'race' mode both are asked at once; the first valid answer wins and
+        the slower request is cancelled.
+        
+        Args:
+            symbols: Token symbols (e.g., ['SOL', 'BTC'])
+            
+        Returns:
+            Dictionary mapping each requested symbol to its USD price or None
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        
+        if self.price_cache is not None:
+            return await self.price_cache.get_many(symbols, self._fetch_prices)
+        
+        return await self._fetch_prices(symbols)
+    
+    async def _fetch_prices(self, symbols: List[str]) -> Dict[str, Optional[float]]:
+        """Fetch prices from the providers, bypassing the cache"""
+        if self.config.price_fetch_mode == "race":
+            prices = await self._fetch_hedged(symbols, 0.0)
+        elif self.config.price_fetch_mode == "hedged":
+            prices = await self._fetch_hedged(symbols, self.get_hedge_delay())
+        else:
+            prices = await self._fetch_sequential(symbols)
+        
+        for symbol in symbols:
+            if symbol not in prices:
+                # All real-time APIs failed
+                self.logger.error(f"All price APIs failed for {symbol} - real-time pricing unavailable")
+        
+        if self.tape_recorder is not None:
+            observed_at = time.time_ns()
+            for symbol, price in prices.items():
+                self.tape_recorder.record(symbol, price, observed_at)
+        
+        return {symbol: prices.get(symbol) for symbol in symbols}
+    
+    def get_hedge_delay(self) -> float:
+        """Get the delay before the backup provider is asked"""
+        if self.config.hedge_delay is not None:
+            return self.config.hedge_delay
+        
+        return self.latency_tracker.hedge_delay(
+            'cryptocompare',
+            self.config.hedge_percentile,
+            self.config.hedge_min_samples,
+            self.config.hedge_initial_delay
+        )
+    
+    async def _fetch_sequential(self, symbols: List[str]) -> Dict[str, float]:
+        """Ask each provider in turn for the symbols still missing"""
+        prices = {}
+        for provider in self._providers:
+            missing = [symbol for symbol in symbols if symbol not in prices]
+            if not missing:
+                break
+            prices.update(await self._fetch_from(provider, missing))
+        return prices
+    
+    async def _fetch_hedged(self, symbols: List[str], hedge_delay: float) -> Dict[str, float]:
+        """
+        Ask the backup provider if the primary has not answered within hedge_delay
+        
+        Args:
+            symbols: Token symbols to price
+            hedge_delay: Seconds to wait for the primary (0 races both)
+            
+        Returns:
+            Merged prices, preferring whichever provider answered first
+        """
+        primary_name, backup_name = list(self._providers)
+        primary = asyncio.ensure_future(self._fetch_from(primary_name, symbols))
+        backup = None
+        
+        try:
+            if hedge_delay > 0:
+                await asyncio.wait({primary}, timeout=hedge_delay)
+                if primary.done():
+                    prices = dict(primary.result())
+                    missing = [symbol for symbol in symbols if symbol not in prices]
+                    if missing:
+                        prices.update(await self._fetch_from(backup_name, missing))
+                    return prices
+                
+                self.latency_tracker.record_hedge()
+                self.logger.debug(f"{primary_name} slower than {hedge_delay:.3f}s, "
+                                  f"hedging with {backup_name}")
+            
+            backup = asyncio.ensure_future(self._fetch_from(backup_name, symbols))
+            names = {primary: primary_name, backup: backup_name}
+            
+            prices = {}
+            pending = {primary, backup}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in (primary, backup):
+                    if task in done and task.result():
+                        if not prices:
+                            self.latency_tracker.record_win(names[task])
+                        for symbol, price in task.result().items():
+                            prices.setdefault(symbol, price)
+                
+                if all(symbol in prices for symbol in symbols):
+                    break
+            
+            return prices
+        finally:
+            # Cancel whichever request lost the race
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+    
+    async def _fetch_from(self, provider: str, symbols: List[str]) -> Dict[str, float]:
+        """Fetch prices from one provider and record its latency"""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        
+        start = time.perf_counter()
         try:
-            url = "https://min-api.cryptocompare.com/data/price"
+            prices = await self._providers[provider](symbols)
+        except asyncio.CancelledError:
+            # A request that lost a hedge race was slow; dropping its sample
+            # would skew the percentile, and so the hedge delay, downwards
+            self.latency_tracker.record(provider, time.perf_counter() - start)
+            raise
+        self.latency_tracker.record(provider, time.perf_counter() - start)
+        return prices
+    
+    async def _fetch_cryptocompare_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Fetch prices from CryptoCompare's pricemulti endpoint"""
+        prices = {}
+        try:
+            url = "https://min-api.cryptocompare.com/data/pricemulti"
             params = {
-                "fsym": token_symbol.upper(),
+                "fsyms": ",".join(symbol.upper() for symbol in symbols),
                 "tsyms": "USD"
             }
             
-            timeout = aiohttp.ClientTimeout(total=3)  # Quick timeout for real-time feel
+            # Quick timeout for real-time feel
+            timeout = aiohttp.ClientTimeout(total=self.config.price_request_timeout)
             async with self.session.get(url, params=params, timeout=timeout) as response:
                 if response.status == 200:
                     data = await response.json()
-                    if "USD" in data:
-                        price = float(data["USD"])
-                        self.logger.info(f"Real-time price for {token_symbol}: ${price:.6f}")
-                        return price
+                    for symbol in symbols:
+                        quote = data.get(symbol.upper())
+                        if isinstance(quote, dict) and "USD" in quote:
+                            prices[symbol] = float(quote["USD"])
+                            self.logger.info(f"Real-time price for {symbol}: ${prices[symbol]:.6f}")
         except Exception as e:
-            self.logger.warning(f"CryptoCompare API failed for {token_symbol}: {e}")
+            self.logger.warning(f"CryptoCompare API failed for {', '.join(symbols)}: {e}")
         
-        # Try CoinGecko as backup for real-time data
-        try:
-            token_id = self.config.get_token_mint(token_symbol)
+        return prices
+    
+    async def _fetch_coingecko_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Fetch prices from CoinGecko's simple/price endpoint"""
+        prices = {}
+        token_ids = {}
+        for symbol in symbols:
+            token_id = self.config.get_token_mint(symbol)
             if token_id:
-                url = f"https://api.coingecko.com/api/v3/simple/price"
-                params = {
-                    "ids": token_id,
-                    "vs_currencies": "usd"
-                }
-                
-                timeout = aiohttp.ClientTimeout(total=3)
-                async with self.session.get(url, params=params, timeout=timeout) as response:
-                    if response.status == 200:
-                        data = await response.json()
+                token_ids[symbol] = token_id
+        
+        if not token_ids:
+            return prices
+        
+        try:
+            url = "https://api.coingecko.com/api/v3/simple/price"
+            params = {
+                "ids": ",".join(dict.fromkeys(token_ids.values())),
+                "vs_currencies": "usd"
+            }
+            
+            timeout = aiohttp.ClientTimeout(total=self.config.price_request_timeout)
+            async with self.session.get(url, params=params, timeout=timeout) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    for symbol, token_id in token_ids.items():
                         if token_id in data and "usd" in data[token_id]:
-                            price = float(data[token_id]["usd"])
-                            self.logger.info(f"Real-time price for {token_symbol} from CoinGecko: ${price:.6f}")
-                            return price
+                            prices[symbol] = float(data[token_id]["usd"])
+                            self.logger.info(f"Real-time price for {symbol} from CoinGecko: ${prices[symbol]:.6f}")
         except Exception as e:
-            self.logger.warning(f"CoinGecko API failed for {token_symbol}: {e}")
-        
-        # All real-time APIs failed
-        self.logger.error(f"All price APIs failed for {token_symbol} - real-time pricing unavailable")
+            self.logger.warning(f"CoinGecko API failed for {', '.join(token_ids)}: {e}")
         
-        return None
+        return prices
     
-
+    def get_latency_stats(self) -> Dict:
+        """Get per-provider latency percentiles and hedging counters"""
+        return self.latency_tracker.get_stats()
     
     async def get_swap_quote(self, input_mint: str, output_mint: str, amount: int) -> Optional[Dict]:
         """
@@ -107,6 +345,9 @@ class JupiterClient:
         }
         
         for attempt in range(self.config.max_retries):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            
             try:
                 async with self.session.get(url, params=params) as response:
                     if response.status == 200:
@@ -127,7 +368,7 @@ class JupiterClient:
         self.logger.error(f"Failed to get swap quote after {self.config.max_retries} attempts")
         return None
     
-    async def monitor_price_changes(self, token_symbol: str, duration: float) -> Tuple[float, float, list]:
+    async def monitor_price_changes(self, token_symbol: str, duration: float) -> Tuple[float, float, PriceSeries]:
         """
         Monitor price changes over a duration
         
@@ -138,45 +379,7 @@ class JupiterClient:
         Returns:
             Tuple of (initial_price, final_price, price_history)
         """
-        price_history = []
-        start_time = datetime.now()
-        
-        # Get initial price
-        initial_price = await self.get_token_price(token_symbol)
-        if initial_price is None:
-            raise ValueError(f"Could not get initial price for {token_symbol}")
-        
-        price_history.append({
-            'timestamp': start_time.isoformat(),
-            'price': initial_price
-        })
-        
-        self.logger.info(f"Starting price monitoring for {token_symbol} at ${initial_price:.6f}")
-        
-        # Monitor price changes
-        elapsed = 0
-        while elapsed < duration:
-            await asyncio.sleep(self.config.quote_interval)
-            
-            current_price = await self.get_token_price(token_symbol)
-            if current_price is not None:
-                price_history.append({
-                    'timestamp': datetime.now().isoformat(),
-                    'price': current_price
-                })
-                
-                change_pct = ((current_price - initial_price) / initial_price) * 100
-                self.logger.debug(f"Price update: ${current_price:.6f} ({change_pct:+.4f}%)")
-            
-            elapsed = (datetime.now() - start_time).total_seconds()
-        
-        # Get final price
-        final_price = price_history[-1]['price'] if price_history else initial_price
-        
-        total_change = ((final_price - initial_price) / initial_price) * 100
-        self.logger.info(f"Price monitoring complete: ${initial_price:.6f} -> ${final_price:.6f} ({total_change:+.4f}%)")
-        
-        return initial_price, final_price, price_history
+        return await monitor_price_changes(self, token_symbol, duration, self.config.quote_interval)
     
     async def estimate_arbitrage_profit(self, token_symbol: str, amount: float, 
                                       price_before: float, price_after: float) -> float:
@@ -197,7 +400,8 @@ class JupiterClient:
         gross_profit = amount * abs(price_diff)
         
         # Subtract estimated costs
-        gas_cost_usd = self.config.gas_cost * (await self.get_token_price("SOL") or 100)
+        sol_price = await self.get_token_price("SOL", max_age=self.config.gas_price_max_age)
+        gas_cost_usd = self.config.gas_cost * (sol_price or 100)
         slippage_cost = amount * price_after * self.config.slippage_tolerance
         
         net_profit = max(0, gross_profit - gas_cost_usd - slippage_cost)
@@ -0,0 +1,116 @@
+"""
+Latency histograms for price provider requests
+"""
+
+import bisect
+from typing import Dict, List, Optional
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with percentile estimates"""
+    
+    def __init__(self, min_latency: float = 0.001, max_latency: float = 30.0,
+                 growth: float = 1.25, max_samples: int = 1000):
+        self.bounds: List[float] = []
+        bound = min_latency
+        while bound < max_latency:
+            self.bounds.append(bound)
+            bound *= growth
+        self.bounds.append(max_latency)
+        
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.max_samples = max_samples
+    
+    def record(self, latency: float):
+        """Record a request latency in seconds"""
+        self.counts[bisect.bisect_left(self.bounds, latency)] += 1
+        self.total += 1
+        
+        # Halve all counts once full so recent samples dominate
+        if self.total >= self.max_samples:
+            self.counts = [count // 2 for count in self.counts]
+            self.total = sum(self.counts)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimate a latency percentile
+        
+        Args:
+            q: Percentile as decimal (e.g., 0.95)
+            
+        Returns:
+            Upper bound of the bucket holding the percentile, or None if empty
+        """
+        if self.total == 0:
+            return None
+        
+        target = q * self.total
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.bounds[min(i, len(self.bounds) - 1)]
+        
+        return self.bounds[-1]
+    
+    def get_summary(self) -> Dict:
+        """Get sample count and common percentiles"""
+        return {
+            'samples': self.total,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99)
+        }
+
+class ProviderLatencyTracker:
+    """Per-provider latency histograms and hedging counters"""
+    
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.hedge_stats = {
+            'hedges_sent': 0,
+            'wins': {}
+        }
+    
+    def record(self, provider: str, latency: float):
+        """Record a request for a provider (time spent so far if it was cancelled)"""
+        if provider not in self.histograms:
+            self.histograms[provider] = LatencyHistogram()
+        self.histograms[provider].record(latency)
+    
+    def record_hedge(self):
+        """Count a backup request sent after the hedge delay"""
+        self.hedge_stats['hedges_sent'] += 1
+    
+    def record_win(self, provider: str):
+        """Count a provider answering first"""
+        wins = self.hedge_stats['wins']
+        wins[provider] = wins.get(provider, 0) + 1
+    
+    def hedge_delay(self, provider: str, percentile: float, min_samples: int,
+                    default: float) -> float:
+        """
+        Get the delay before hedging a request to a provider
+        
+        Args:
+            provider: Primary provider name
+            percentile: Latency percentile to wait for (e.g., 0.95)
+            min_samples: Samples required before trusting the histogram
+            default: Delay used until enough samples are recorded
+            
+        Returns:
+            Hedge delay in seconds
+        """
+        histogram = self.histograms.get(provider)
+        if histogram is None or histogram.total < min_samples:
+            return default
+        return histogram.percentile(percentile)
+    
+    def get_stats(self) -> Dict:
+        """Get latency summaries for every provider"""
+        return {
+            'providers': {name: histogram.get_summary()
+                          for name, histogram in self.histograms.items()},
+            'hedges_sent': self.hedge_stats['hedges_sent'],
+            'wins': dict(self.hedge_stats['wins'])
+        }
@@ -26,7 +26,7 @@ class MEVCalculator:
             trade_amount: Amount of tokens in trade
             initial_price: Price when OTC order placed
             final_price: Price after delay
-            jupiter_client: Jupiter API client for additional data
+            jupiter_client: Price provider (e.g. Jupiter API client) for gas pricing
             
         Returns:
             Estimated MEV profit in USD
@@ -37,7 +37,9 @@ class MEVCalculator:
             gross_profit = trade_amount * abs(price_diff)
             
             # Get current SOL price for gas cost calculations
-            sol_price = await jupiter_client.get_token_price("SOL")
+            sol_price = await jupiter_client.get_token_price(
+                "SOL", max_age=self.config.gas_price_max_age
+            )
             if sol_price is None:
                 sol_price = 100.0  # Fallback SOL price
             
@@ -0,0 +1,227 @@
+"""
+Vectorized Monte Carlo engine for front-running risk and MEV distributions
+"""
+
+import logging
+import math
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from .config import Config
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+# Step tables mirroring RiskDetector and MEVCalculator (value < bound picks the level)
+IMPACT_FACTOR_BOUNDS = np.array([1000.0, 10000.0, 100000.0])
+IMPACT_FACTOR_LEVELS = np.array([0.1, 0.3, 0.6, 1.0])
+VOLUME_RISK_BOUNDS = np.array([10000.0, 50000.0, 200000.0])
+VOLUME_RISK_LEVELS = np.array([0.2, 0.4, 0.7, 1.0])
+MARKET_IMPACT_BOUNDS = np.array([10000.0, 100000.0, 500000.0])
+MARKET_IMPACT_RATES = np.array([0.001, 0.003, 0.007, 0.015])
+OPPORTUNITY_ANNUAL_RATE = 0.05
+
+class MonteCarloEngine:
+    """Evaluates risk scores and net MEV over arrays of simulated trades"""
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+    
+    def evaluate(self, initial_prices: ArrayLike, final_prices: ArrayLike, amounts: ArrayLike,
+                 sol_price: ArrayLike = 100.0, delay: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Apply the RiskDetector and MEVCalculator formulas element-wise
+        
+        Args:
+            initial_prices: Prices when each OTC order was placed
+            final_prices: Prices after the delay
+            amounts: Trade sizes in token units (broadcast against prices)
+            sol_price: SOL price used for gas costs
+            delay: Delay in seconds for opportunity cost (defaults to config.delay)
+            
+        Returns:
+            Per-trade arrays: price_change, risk_score, risk_detected, gross_profit,
+            total_costs, net_profit and mev_profit (net profit where risk is detected)
+        """
+        initial = np.asarray(initial_prices, dtype=float)
+        final = np.asarray(final_prices, dtype=float)
+        amount = np.asarray(amounts, dtype=float)
+        threshold = self.config.threshold
+        delay = self.config.delay if delay is None else delay
+        
+        # Risk score (RiskDetector.detect_risk)
+        price_change = (final - initial) / initial
+        abs_change = np.abs(price_change)
+        trade_value = amount * initial
+        
+        impact_factor = IMPACT_FACTOR_LEVELS[np.searchsorted(IMPACT_FACTOR_BOUNDS, trade_value, side="right")]
+        volume_risk = VOLUME_RISK_LEVELS[np.searchsorted(VOLUME_RISK_BOUNDS, trade_value, side="right")]
+        directional_risk = np.where(
+            price_change < 0,
+            np.minimum(1.0, abs_change / threshold),
+            np.maximum(0.0, price_change / (threshold * 2))
+        )
+        price_component = np.minimum(1.0, abs_change / threshold)
+        
+        risk_score = np.minimum(1.0, (
+            price_component * 0.4 +
+            impact_factor * 0.2 +
+            directional_risk * 0.25 +
+            volume_risk * 0.15
+        ))
+        risk_detected = risk_score > 0.5
+        
+        # Net MEV profit (MEVCalculator.calculate_mev_profit)
+        gross_profit = amount * np.abs(final - initial)
+        gas_cost_usd = self.config.gas_cost * np.asarray(sol_price, dtype=float)
+        slippage_cost = amount * final * self.config.slippage_tolerance
+        market_impact_cost = trade_value * MARKET_IMPACT_RATES[
+            np.searchsorted(MARKET_IMPACT_BOUNDS, trade_value, side="right")]
+        opportunity_cost = trade_value * OPPORTUNITY_ANNUAL_RATE * (delay / SECONDS_PER_YEAR)
+        
+        total_costs = gas_cost_usd + slippage_cost + market_impact_cost + opportunity_cost
+        net_profit = np.maximum(0.0, gross_profit - total_costs)
+        
+        return {
+            'price_change': price_change,
+            'risk_score': risk_score,
+            'risk_detected': risk_detected,
+            'gross_profit': gross_profit,
+            'total_costs': total_costs,
+            'net_profit': net_profit,
+            'mev_profit': np.where(risk_detected, net_profit, 0.0),
+            'trade_value': np.broadcast_to(trade_value, price_change.shape)
+        }
+    
+    def run(self, paths: np.ndarray, amounts: ArrayLike, sol_price: ArrayLike = 100.0,
+            delay: Optional[float] = None, confidence_levels: Sequence[float] = (0.95, 0.99),
+            return_arrays: bool = False) -> Dict:
+        """
+        Evaluate simulated price paths and summarize the outcome distributions
+        
+        Args:
+            paths: Array of shape (n_paths, n_steps + 1); the first and last
+                columns are the order and execution prices
+            amounts: Trade sizes in token units, scalar or one per path
+            sol_price: SOL price used for gas costs
+            delay: Delay in seconds for opportunity cost (defaults to config.delay)
+            confidence_levels: Levels for VaR/CVaR
+            return_arrays: Include the per-path arrays in the result
+            
+        Returns:
+            Distribution summary (and per-path arrays if requested)
+        """
+        paths = np.asarray(paths, dtype=float)
+        evaluation = self.evaluate(paths[:, 0], paths[:, -1], amounts, sol_price, delay)
+        
+        result = self.summarize(evaluation, confidence_levels)
+        if return_arrays:
+            result['arrays'] = evaluation
+        return result
+    
+    def simulate(self, provider, token: str, amounts: ArrayLike, n_paths: int,
+                 delay: Optional[float] = None, sol_price: Optional[float] = None,
+                 chunk_size: int = 250000) -> Dict:
+        """
+        Generate paths from a synthetic provider and summarize them
+        
+        Paths are generated and evaluated in chunks to bound memory.
+        
+        Args:
+            provider: SyntheticPriceProvider used to generate paths
+            token: Token symbol
+            amounts: Trade size in token units (scalar)
+            n_paths: Number of simulated trades
+            delay: Delay in seconds (defaults to config.delay)
+            sol_price: SOL price for gas costs (defaults to SOL's starting price)
+            chunk_size: Paths generated per chunk
+            
+        Returns:
+            Distribution summary as from run()
+        """
+        delay = self.config.delay if delay is None else delay
+        n_steps = max(1, math.ceil(delay / provider.step_seconds))
+        if sol_price is None:
+            sol_price = provider.get_dynamics("SOL").initial_price
+        
+        start_time = datetime.now()
+        chunks = []
+        for start in range(0, n_paths, chunk_size):
+            paths = provider.generate_paths(token, min(chunk_size, n_paths - start), n_steps)
+            chunks.append(self.evaluate(paths[:, 0], paths[:, -1], amounts, sol_price, delay))
+        
+        evaluation = {key: np.concatenate([np.broadcast_to(chunk[key], chunk['price_change'].shape)
+                                           for chunk in chunks])
+                      for key in chunks[0]}
+        
+        result = self.summarize(evaluation)
+        result.update({
+            'token': token,
+            'delay_seconds': delay,
+            'steps_per_path': n_steps,
+            'execution_time': (datetime.now() - start_time).total_seconds()
+        })
+        
+        self.logger.info(f"Monte Carlo: {n_paths} paths for {token}, "
+                         f"risk {result['risk_probability'] * 100:.2f}%, "
+                         f"mean MEV ${result['mev_profit']['mean']:.2f}")
+        
+        return result
+    
+    def summarize(self, evaluation: Dict[str, np.ndarray],
+                  confidence_levels: Sequence[float] = (0.95, 0.99)) -> Dict:
+        """
+        Summarize per-trade arrays into distributions
+        
+        Args:
+            evaluation: Output of evaluate()
+            confidence_levels: Levels for VaR/CVaR
+            
+        Returns:
+            Risk probability, percentile bands, and VaR/CVaR of MEV extracted
+            and of the trade's mark-to-market P&L
+        """
+        mev = evaluation['mev_profit']
+        # Loss to the OTC seller when the price moves against them during the delay
+        pnl = evaluation['price_change'] * evaluation['trade_value']
+        
+        return {
+            'paths': int(mev.size),
+            'risk_probability': float(np.mean(evaluation['risk_detected'])),
+            'risk_score': self._distribution(evaluation['risk_score']),
+            'price_change_pct': self._distribution(evaluation['price_change'] * 100),
+            'mev_profit': {
+                **self._distribution(mev),
+                **self._tail_risk(mev, confidence_levels)
+            },
+            'pnl': {
+                **self._distribution(pnl),
+                **self._tail_risk(-pnl, confidence_levels)
+            }
+        }
+    
+    def _distribution(self, values: np.ndarray) -> Dict:
+        """Mean, standard deviation and percentile bands"""
+        bands = np.percentile(values, [1, 5, 25, 50, 75, 95, 99])
+        return {
+            'mean': float(np.mean(values)),
+            'std': float(np.std(values)),
+            'min': float(np.min(values)),
+            'max': float(np.max(values)),
+            'percentiles': {f"p{q}": float(v) for q, v in zip([1, 5, 25, 50, 75, 95, 99], bands)}
+        }
+    
+    def _tail_risk(self, losses: np.ndarray, confidence_levels: Sequence[float]) -> Dict:
+        """Value at Risk and Conditional VaR of a loss distribution"""
+        tail = {}
+        for level in confidence_levels:
+            var = float(np.quantile(losses, level))
+            beyond = losses[losses >= var]
+            key = f"{level * 100:g}"
+            tail[f"var_{key}"] = var
+            tail[f"cvar_{key}"] = float(np.mean(beyond)) if beyond.size else var
+        return tail
@@ -2,12 +2,23 @@
 OTC trade simulator with front-running risk detection
 """
 
-import asyncio
 import logging
+from contextlib import aclosing, asynccontextmanager
 from datetime import datetime
-from typing import Dict, List
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from .clock import Clock, create_clock
 from .jupiter_client import JupiterClient
+from .history_store import HistoryStore
+from .http_session import HTTPSessionPool
+from .price_cache import PriceCache
+from .price_provider import PriceProvider, TapeReplayProvider, monitor_price_changes
+from .price_series import PriceSeries
+from .price_tape import TapeRecorder
+from .synthetic import SyntheticPriceProvider
+from .monte_carlo import MonteCarloEngine
+from .rate_limiter import AsyncRateLimiter
 from .risk_detector import RiskDetector
+from .streaming import BatchAnalyzer, stream_as_completed
 from .mev_calculator import MEVCalculator
 from .config import Config
 from .enhanced_features import (
@@ -17,21 +28,54 @@ from .enhanced_features import (
 class OTCSimulator:
     """Main OTC simulation engine"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, http_pool: Optional[HTTPSessionPool] = None,
+                 price_cache: Optional[PriceCache] = None,
+                 price_provider: Optional[PriceProvider] = None,
+                 tape_recorder: Optional[TapeRecorder] = None,
+                 rate_limiter: Optional[AsyncRateLimiter] = None,
+                 clock: Optional[Clock] = None,
+                 history_store: Optional[HistoryStore] = None,
+                 historical_tracker: Optional[HistoricalTracker] = None):
         self.config = config
         self.config.validate()
         self.logger = logging.getLogger(__name__)
+        self.http_pool = http_pool
         
-        # Initialize enhanced features
-        if config.historical_tracking:
-            self.historical_tracker = HistoricalTracker(config)
-        else:
-            self.historical_tracker = None
+        # Offline sources run on virtual time so backtests don't wait on the wall clock
+        self.clock = clock or create_clock(config)
+        
+        # Prices are cached across trades so concurrent simulations share lookups
+        if price_cache is None and config.price_cache_enabled:
+            price_cache = PriceCache.from_config(config)
+        self.price_cache = price_cache
+        
+        # Offline sources are opened once and shared by every trade
+        if price_provider is None and config.price_source == "tape":
+            price_provider = TapeReplayProvider.from_file(config.price_tape_path)
+        elif price_provider is None and config.price_source == "synthetic":
+            price_provider = SyntheticPriceProvider.from_config(config)
+        self.price_provider = price_provider
+        self.tape_recorder = tape_recorder
+        
+        # One limiter shared by every concurrent trade of this simulator
+        if rate_limiter is None:
+            rate_limiter = AsyncRateLimiter.from_config(config)
+        self.rate_limiter = rate_limiter
+        
+        # Persisted ticks let the tracker start warm after a restart
+        self.history_store = history_store
+        
+        # Initialize enhanced features (batch runs share one tracker across tokens)
+        if historical_tracker is None and config.historical_tracking:
+            historical_tracker = HistoricalTracker(config, self.clock, history_store)
+        self.historical_tracker = historical_tracker
             
         if config.enable_alerts:
-            self.alert_system = AlertSystem(config)
+            self.alert_system = AlertSystem(config, self.clock)
             # Add default alerts
             self.alert_system.add_alert(config.token, config.alert_threshold)
+            for threshold, horizon in config.horizon_alerts:
+                self.alert_system.add_alert(config.token, threshold, horizon_seconds=horizon)
         else:
             self.alert_system = None
             
@@ -40,10 +84,28 @@ class OTCSimulator:
         else:
             self.advanced_risk_scorer = None
             
-        self.batch_simulator = BatchSimulator(config)
+        self.batch_simulator = BatchSimulator(config, http_pool, price_cache, price_provider,
+                                              tape_recorder, rate_limiter, self.clock,
+                                              history_store, self.historical_tracker)
         self.risk_detector = RiskDetector(config)
         self.mev_calculator = MEVCalculator(config)
     
+    @asynccontextmanager
+    async def open_price_provider(self):
+        """Yield the injected price provider, or a live Jupiter client for one trade"""
+        if self.price_provider is not None:
+            yield self.price_provider
+            return
+        
+        # Reuse pooled connections when the app provides a shared session
+        session = await self.http_pool.get_session() if self.http_pool else None
+        
+        async with JupiterClient(self.config, session=session,
+                                 price_cache=self.price_cache,
+                                 tape_recorder=self.tape_recorder,
+                                 rate_limiter=self.rate_limiter) as jupiter:
+            yield jupiter
+    
     async def simulate_otc_trade(self) -> Dict:
         """
         Simulate a single OTC trade with front-running risk analysis
@@ -53,12 +115,12 @@ class OTCSimulator:
         """
         self.logger.info(f"Simulating OTC trade: {self.config.amount} {self.config.token}")
         
-        start_time = datetime.now()
+        start_time = self.clock.now()
         
-        async with JupiterClient(self.config) as jupiter:
+        async with self.open_price_provider() as provider:
             try:
                 # Step 1: Get initial quote (OTC order placement)
-                initial_price = await jupiter.get_token_price(self.config.token)
+                initial_price = await provider.get_token_price(self.config.token)
                 if initial_price is None:
                     raise ValueError(f"Could not get initial price for {self.config.token}")
                 
@@ -71,176 +133,229 @@ class OTCSimulator:
                 # Step 2: Simulate block delay and monitor price changes
                 self.logger.info(f"Simulating {self.config.delay}s block delay...")
                 
-                initial_price_monitor, final_price, price_history = await jupiter.monitor_price_changes(
+                initial_price_monitor, final_price, price_history = await monitor_price_changes(
+                    provider,
                     self.config.token, 
-                    self.config.delay
+                    self.config.delay,
+                    self.config.quote_interval,
+                    self.clock,
+                    self.alert_system.on_prices if self.alert_system else None
                 )
                 
-                # Add final price to historical tracking
-                if self.historical_tracker:
-                    self.historical_tracker.add_price_data(self.config.token, final_price)
-                
-                # Check alerts
-                if self.alert_system:
-                    self.alert_system.check_alerts(self.config.token, final_price, initial_price)
-                
-                # Step 3: Analyze risk and calculate MEV
-                price_change = ((final_price - initial_price) / initial_price)
-                price_change_pct = price_change * 100
-                
-                risk_detected = self.risk_detector.detect_risk(
-                    initial_price, 
-                    final_price, 
-                    self.config.amount
+                return await self.evaluate_trade(
+                    provider, start_time, initial_price, final_price, price_history
                 )
                 
-                mev_profit = 0.0
-                if risk_detected:
-                    mev_profit = await self.mev_calculator.calculate_mev_profit(
-                        self.config.token,
-                        self.config.amount,
-                        initial_price,
-                        final_price,
-                        jupiter
-                    )
-                
-                # Step 3.5: Enhanced risk analysis
-                enhanced_analysis = {}
-                if self.advanced_risk_scorer and self.historical_tracker:
-                    volatility = self.historical_tracker.calculate_volatility(self.config.token)
-                    market_patterns = self.historical_tracker.detect_market_patterns(self.config.token)
-                    
-                    enhanced_analysis = self.advanced_risk_scorer.calculate_advanced_risk_score(
-                        self.config.token,
-                        self.config.amount * initial_price,  # Trade value in USD
-                        price_change,
-                        volatility,
-                        market_patterns.get("patterns", [])
-                    )
-                
-                # Step 4: Compile results
-                execution_time = (datetime.now() - start_time).total_seconds()
-                
-                result = {
-                    'timestamp': start_time.isoformat(),
-                    'token': self.config.token,
-                    'amount': self.config.amount,
-                    'delay_seconds': self.config.delay,
-                    'initial_price': initial_price,
-                    'final_price': final_price,
-                    'price_change': price_change_pct,
-                    'price_history': price_history,
-                    'risk_detected': risk_detected,
-                    'risk_threshold': self.config.threshold * 100,
-                    'mev_profit': mev_profit,
-                    'execution_time': execution_time,
-                    'risk_analysis': self.risk_detector.get_risk_details(),
-                    'mev_analysis': self.mev_calculator.get_calculation_details(),
-                    'enhanced_analysis': enhanced_analysis,
-                    'alerts_triggered': self.alert_system.get_recent_alerts(1) if self.alert_system else [],
-                    'market_volatility': self.historical_tracker.calculate_volatility(self.config.token) if self.historical_tracker else 0.0
-                }
-                
-                self.logger.info(f"Trade simulation complete: "
-                               f"Price change: {price_change_pct:+.4f}%, "
-                               f"Risk: {'YES' if risk_detected else 'NO'}, "
-                               f"MEV: ${mev_profit:.2f}")
-                
-                return result
-                
             except Exception as e:
-                self.logger.error(f"Simulation failed: {e}")
-                return {
-                    'timestamp': start_time.isoformat(),
-                    'token': self.config.token,
-                    'amount': self.config.amount,
-                    'error': str(e),
-                    'risk_detected': False,
-                    'mev_profit': 0.0
-                }
+                return self.error_result(start_time, e)
     
-    async def run_batch_simulation(self, iterations: int = None) -> List[Dict]:
+    async def evaluate_trade(self, provider: PriceProvider, start_time: datetime,
+                             initial_price: float, final_price: float,
+                             price_history: PriceSeries, track_final_price: bool = True) -> Dict:
         """
-        Run multiple simulation iterations
+        Analyze risk and MEV for a monitored trade and compile its result
         
         Args:
-            iterations: Number of iterations (uses config default if None)
+            provider: Price source used for gas pricing
+            start_time: When the OTC order was placed
+            initial_price: Price when the OTC order was placed
+            final_price: Price after the delay
+            price_history: Ticks observed during the delay
+            track_final_price: Record the final price in the historical tracker
+                (callers sharing one window record it themselves)
             
         Returns:
-            List of simulation results
+            Dictionary containing simulation results
+        """
+        # Add final price to historical tracking
+        if self.historical_tracker and track_final_price:
+            self.historical_tracker.add_price_data(self.config.token, final_price)
+        
+        # Check alerts
+        if self.alert_system:
+            self.alert_system.check_alerts(self.config.token, final_price, initial_price)
+        
+        # Step 3: Analyze risk and calculate MEV
+        price_change = ((final_price - initial_price) / initial_price)
+        price_change_pct = price_change * 100
+        
+        risk_detected = self.risk_detector.detect_risk(
+            initial_price, 
+            final_price, 
+            self.config.amount
+        )
+        # Capture before awaiting; concurrent trades share the detector
+        risk_analysis = self.risk_detector.get_risk_details()
+        
+        mev_profit = 0.0
+        if risk_detected:
+            mev_profit = await self.mev_calculator.calculate_mev_profit(
+                self.config.token,
+                self.config.amount,
+                initial_price,
+                final_price,
+                provider
+            )
+        
+        # Step 3.5: Enhanced risk analysis
+        enhanced_analysis = {}
+        if self.advanced_risk_scorer and self.historical_tracker:
+            volatility = self.historical_tracker.calculate_volatility(self.config.token)
+            market_patterns = self.historical_tracker.detect_market_patterns(self.config.token)
+            
+            enhanced_analysis = self.advanced_risk_scorer.calculate_advanced_risk_score(
+                self.config.token,
+                self.config.amount * initial_price,  # Trade value in USD
+                price_change,
+                volatility,
+                market_patterns.get("patterns", []),
+                self.historical_tracker.get_correlations(self.config.token)
+            )
+        
+        # Step 4: Compile results
+        execution_time = (self.clock.now() - start_time).total_seconds()
+        
+        result = {
+            'timestamp': start_time.isoformat(),
+            'token': self.config.token,
+            'amount': self.config.amount,
+            'delay_seconds': self.config.delay,
+            'initial_price': initial_price,
+            'final_price': final_price,
+            'price_change': price_change_pct,
+            'price_history': price_history,
+            'risk_detected': risk_detected,
+            'risk_threshold': self.config.threshold * 100,
+            'mev_profit': mev_profit,
+            'execution_time': execution_time,
+            'risk_analysis': risk_analysis,
+            'mev_analysis': self.mev_calculator.get_calculation_details(),
+            'enhanced_analysis': enhanced_analysis,
+            'alerts_triggered': self.alert_system.get_recent_alerts(1) if self.alert_system else [],
+            'market_volatility': self.historical_tracker.calculate_volatility(self.config.token) if self.historical_tracker else 0.0
+        }
+        
+        self.logger.info(f"Trade simulation complete: "
+                       f"Price change: {price_change_pct:+.4f}%, "
+                       f"Risk: {'YES' if risk_detected else 'NO'}, "
+                       f"MEV: ${mev_profit:.2f}")
+        
+        return result
+    
+    def error_result(self, start_time: datetime, error: Exception) -> Dict:
+        """Build the result recorded for a failed simulation"""
+        self.logger.error(f"Simulation failed: {error}")
+        return {
+            'timestamp': start_time.isoformat(),
+            'token': self.config.token,
+            'amount': self.config.amount,
+            'error': str(error),
+            'risk_detected': False,
+            'mev_profit': 0.0
+        }
+    
+    async def stream_batch_simulation(self, iterations: int = None,
+                                      concurrency: int = None) -> AsyncIterator[Dict]:
+        """
+        Run multiple simulation iterations, yielding each result as it completes
+        
+        With concurrency above 1, up to that many iterations run at once so
+        their monitoring windows overlap; price requests are paced by the
+        shared rate limiter instead of sleeping between iterations. At most
+        ``config.stream_buffer_size`` finished results are buffered, so a slow
+        consumer holds back new iterations.
+        
+        Args:
+            iterations: Number of iterations (uses config default if None)
+            concurrency: Iterations run at once (uses config default if None)
+            
+        Yields:
+            Simulation results in completion order
         """
         if iterations is None:
             iterations = self.config.iterations
+        if concurrency is None:
+            concurrency = self.config.concurrency
         
-        self.logger.info(f"Starting batch simulation: {iterations} iterations")
+        self.logger.info(f"Starting batch simulation: {iterations} iterations"
+                         f"{f', concurrency {concurrency}' if concurrency > 1 else ''}")
         
-        results = []
-        for i in range(iterations):
-            self.logger.info(f"Running iteration {i + 1}/{iterations}")
-            
-            result = await self.simulate_otc_trade()
-            results.append(result)
+        if concurrency > 1:
+            def make_iteration(i: int):
+                async def run_iteration() -> Dict:
+                    self.logger.info(f"Running iteration {i + 1}/{iterations}")
+                    return await self.simulate_otc_trade()
+                return run_iteration
             
-            # Add small delay between iterations to avoid rate limiting
-            if i < iterations - 1:
-                await asyncio.sleep(1.0)
+            jobs = (make_iteration(i) for i in range(iterations))
+            # aclosing() cancels in-flight iterations if the consumer stops early
+            async with aclosing(stream_as_completed(jobs, concurrency,
+                                                   self.config.stream_buffer_size)) as results:
+                async for result in results:
+                    yield result
+        else:
+            for i in range(iterations):
+                self.logger.info(f"Running iteration {i + 1}/{iterations}")
+                
+                yield await self.simulate_otc_trade()
+                
+                # Add small delay between iterations to avoid rate limiting
+                if i < iterations - 1:
+                    await self.clock.sleep(1.0)
         
-        self.logger.info(f"Batch simulation complete: {len(results)} results")
-        return results
+        self.logger.info(f"Batch simulation complete: {iterations} iterations")
+    
+    async def run_batch_simulation(self, iterations: int = None,
+                                   concurrency: int = None) -> List[Dict]:
+        """
+        Run multiple simulation iterations
+        
+        Args:
+            iterations: Number of iterations (uses config default if None)
+            concurrency: Iterations run at once (uses config default if None)
+            
+        Returns:
+            List of simulation results in completion order
+        """
+        return [result async for result in self.stream_batch_simulation(iterations, concurrency)]
     
-    def analyze_batch_results(self, results: List[Dict]) -> Dict:
+    def analyze_batch_results(self, results: Iterable[Dict]) -> Dict:
         """
         Analyze results from batch simulation
         
         Args:
-            results: List of simulation results
+            results: Simulation results
             
         Returns:
             Analysis summary
         """
-        if not results:
-            return {'error': 'No results to analyze'}
-        
-        successful_results = [r for r in results if 'error' not in r]
-        
-        if not successful_results:
-            return {'error': 'No successful simulations'}
-        
-        # Calculate statistics
-        risks_detected = sum(1 for r in successful_results if r['risk_detected'])
-        total_mev = sum(r['mev_profit'] for r in successful_results)
-        price_changes = [r['price_change'] for r in successful_results]
-        
-        analysis = {
-            'total_simulations': len(results),
-            'successful_simulations': len(successful_results),
-            'risks_detected': risks_detected,
-            'risk_percentage': (risks_detected / len(successful_results)) * 100,
-            'total_mev_profit': total_mev,
-            'average_mev_per_simulation': total_mev / len(successful_results),
-            'average_mev_per_risk': total_mev / risks_detected if risks_detected > 0 else 0,
-            'price_change_stats': {
-                'min': min(price_changes),
-                'max': max(price_changes),
-                'average': sum(price_changes) / len(price_changes),
-                'volatility': self._calculate_volatility(price_changes)
-            },
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        self.logger.info(f"Batch analysis: {risks_detected}/{len(successful_results)} risks detected, "
-                        f"${total_mev:.2f} total MEV")
+        analyzer = BatchAnalyzer()
+        for result in results:
+            analyzer.add(result)
+        return self._log_analysis(analyzer.get_analysis())
+    
+    async def analyze_batch_stream(self, results: AsyncIterator[Dict]) -> Dict:
+        """
+        Analyze a stream of simulation results without keeping them in memory
         
-        return analysis
+        Args:
+            results: Async iterator of simulation results
+            
+        Returns:
+            Analysis summary
+        """
+        analyzer = BatchAnalyzer()
+        async for result in results:
+            analyzer.add(result)
+        return self._log_analysis(analyzer.get_analysis())
     
-    def _calculate_volatility(self, price_changes: List[float]) -> float:
-        """Calculate price change volatility (standard deviation)"""
-        if len(price_changes) < 2:
-            return 0.0
-        
-        mean = sum(price_changes) / len(price_changes)
-        variance = sum((x - mean) ** 2 for x in price_changes) / len(price_changes)
-        return variance ** 0.5
+    def _log_analysis(self, analysis: Dict) -> Dict:
+        """Log a batch analysis summary and pass it through"""
+        if 'error' not in analysis:
+            self.logger.info(f"Batch analysis: {analysis['risks_detected']}/"
+                             f"{analysis['successful_simulations']} risks detected, "
+                             f"${analysis['total_mev_profit']:.2f} total MEV")
+        return analysis
     
     async def run_enhanced_batch_simulation(self) -> Dict:
         """Run enhanced batch simulation with multiple tokens and delay periods"""
@@ -275,16 +390,51 @@ class OTCSimulator:
         
         return results
     
+    def run_monte_carlo_simulation(self, n_paths: int = None) -> Dict:
+        """
+        Estimate risk and MEV distributions over synthetic price paths
+        
+        Args:
+            n_paths: Number of simulated trades (uses config default if None)
+            
+        Returns:
+            Distribution summary with VaR/CVaR and percentile bands
+        """
+        if n_paths is None:
+            n_paths = self.config.monte_carlo_paths
+        
+        provider = self.price_provider
+        if not isinstance(provider, SyntheticPriceProvider):
+            provider = SyntheticPriceProvider.from_config(self.config)
+        
+        engine = MonteCarloEngine(self.config)
+        return engine.simulate(provider, self.config.token, self.config.amount, n_paths)
+    
     def get_market_insights(self) -> Dict:
-        """Get comprehensive market insights from enhanced features"""
+        """
+        Get comprehensive market insights from enhanced features
+        
+        Correlations and beta come from aligned cross-token ticks, which only
+        multi-token batch runs feed; until one has run they are empty/None and
+        ``correlation_samples`` is 0.
+        """
         insights = {}
         
         if self.historical_tracker:
+            samples = len(self.historical_tracker.correlation)
             for token in self.config.batch_tokens:
                 insights[token] = {
                     "volatility": self.historical_tracker.calculate_volatility(token),
                     "trend": self.historical_tracker.get_price_trend(token),
-                    "patterns": self.historical_tracker.detect_market_patterns(token)
+                    "patterns": self.historical_tracker.detect_market_patterns(token),
+                    "correlations": self.historical_tracker.get_correlations(token),
+                    "beta": self.historical_tracker.get_beta(token),
+                    "correlation_samples": samples
                 }
+            self.logger.debug(f"Insight cache: {self.historical_tracker.get_cache_stats()}")
         
         return insights
+    
+    def get_insight_cache_stats(self) -> Dict:
+        """Get hit rates of the historical tracker's insight cache"""
+        return self.historical_tracker.get_cache_stats() if self.historical_tracker else {}
@@ -0,0 +1,191 @@
+"""
+TTL price cache with stale-while-revalidate and single-flight lookups
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .config import Config
+
+FetchMany = Callable[[List[str]], Awaitable[Dict[str, Optional[float]]]]
+
+class PriceCache:
+    """Per-symbol price cache shared by concurrent price lookups"""
+    
+    def __init__(self, default_ttl: float, ttls: Optional[Dict[str, float]] = None,
+                 stale_ttl: float = 0.0):
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.stale_ttl = stale_ttl
+        self.logger = logging.getLogger(__name__)
+        
+        self._entries: Dict[str, Tuple[float, float]] = {}  # symbol -> (price, fetched_at)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._fetch_tasks = set()
+        self.stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'refreshes': 0
+        }
+    
+    @classmethod
+    def from_config(cls, config: Config) -> 'PriceCache':
+        """Create a cache using the configured TTLs"""
+        return cls(
+            default_ttl=config.price_cache_ttl,
+            ttls=config.price_cache_ttls,
+            stale_ttl=config.price_cache_stale_ttl
+        )
+    
+    def get_ttl(self, symbol: str) -> float:
+        """Get the freshness TTL for a symbol"""
+        return self.ttls.get(symbol.upper(), self.default_ttl)
+    
+    def _lookup(self, symbol: str, max_age: Optional[float]) -> Tuple[Optional[float], str]:
+        """Classify a cached entry as 'fresh', 'stale' or 'miss'"""
+        entry = self._entries.get(symbol)
+        if entry is None:
+            return None, 'miss'
+        
+        price, fetched_at = entry
+        age = time.monotonic() - fetched_at
+        ttl = self.get_ttl(symbol) if max_age is None else max_age
+        
+        if age <= ttl:
+            return price, 'fresh'
+        if age <= ttl + self.stale_ttl:
+            return price, 'stale'
+        return None, 'miss'
+    
+    async def get(self, symbol: str, fetch_many: FetchMany,
+                  max_age: Optional[float] = None) -> Optional[float]:
+        """
+        Get a price from cache or fetch it
+        
+        Args:
+            symbol: Token symbol
+            fetch_many: Coroutine function fetching prices for a list of symbols
+            max_age: Accept cached prices up to this many seconds old instead of the TTL
+            
+        Returns:
+            Token price in USD or None if unavailable
+        """
+        prices = await self.get_many([symbol], fetch_many, max_age)
+        return prices[symbol]
+    
+    async def get_many(self, symbols: List[str], fetch_many: FetchMany,
+                       max_age: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """
+        Get prices for several symbols, fetching only the uncached ones
+        
+        Fresh entries are returned directly. Stale entries inside the
+        stale-while-revalidate window are returned and refreshed in the
+        background. Symbols already being fetched join that request instead
+        of starting another. Symbols are cached case-insensitively, so 'sol'
+        and 'SOL' share one entry and one fetch.
+        
+        Args:
+            symbols: Token symbols
+            fetch_many: Coroutine function fetching prices for a list of symbols
+            max_age: Accept cached prices up to this many seconds old instead of the TTL
+            
+        Returns:
+            Dictionary mapping each symbol to its USD price or None
+        """
+        prices = {}
+        waiting = {}
+        pending = {}  # requested symbol -> cache key fetched below
+        missing = {}
+        stale = {}
+        
+        for symbol in symbols:
+            key = symbol.upper()
+            price, state = self._lookup(key, max_age)
+            if state == 'fresh':
+                self.stats['hits'] += 1
+                prices[symbol] = price
+            elif state == 'stale':
+                self.stats['stale_hits'] += 1
+                prices[symbol] = price
+                if key not in self._in_flight:
+                    stale[key] = None
+            elif key in self._in_flight:
+                self.stats['coalesced'] += 1
+                waiting[symbol] = self._in_flight[key]
+            elif key in missing:
+                self.stats['coalesced'] += 1
+                pending[symbol] = key
+            else:
+                self.stats['misses'] += 1
+                missing[key] = None
+                pending[symbol] = key
+        
+        if stale:
+            self.stats['refreshes'] += len(stale)
+            self._start_fetch(list(stale), fetch_many)
+        
+        if missing:
+            futures = self._start_fetch(list(missing), fetch_many)
+            waiting.update({symbol: futures[key] for symbol, key in pending.items()})
+        
+        for symbol, future in waiting.items():
+            # Shield so one cancelled caller does not cancel the shared fetch
+            prices[symbol] = await asyncio.shield(future)
+        
+        return prices
+    
+    def _start_fetch(self, symbols: List[str], fetch_many: FetchMany) -> Dict[str, asyncio.Future]:
+        """Start one fetch for the symbols and register it as in flight"""
+        loop = asyncio.get_running_loop()
+        futures = {symbol: loop.create_future() for symbol in symbols}
+        self._in_flight.update(futures)
+        
+        task = loop.create_task(self._run_fetch(symbols, fetch_many, futures))
+        self._fetch_tasks.add(task)
+        task.add_done_callback(self._fetch_tasks.discard)
+        
+        return futures
+    
+    async def _run_fetch(self, symbols: List[str], fetch_many: FetchMany,
+                         futures: Dict[str, asyncio.Future]):
+        """Fetch prices, store them and resolve every waiter"""
+        fetched = {}
+        try:
+            fetched = await fetch_many(symbols)
+        except Exception as e:
+            self.logger.warning(f"Price fetch failed for {', '.join(symbols)}: {e}")
+        finally:
+            now = time.monotonic()
+            for symbol in symbols:
+                price = fetched.get(symbol)
+                if price is not None:
+                    self._entries[symbol] = (price, now)
+                
+                future = futures[symbol]
+                if self._in_flight.get(symbol) is future:
+                    del self._in_flight[symbol]
+                if not future.done():
+                    future.set_result(price)
+    
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drop one cached symbol, or every symbol"""
+        if symbol is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(symbol.upper(), None)
+    
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters and hit rate"""
+        lookups = sum(self.stats.values()) - self.stats['refreshes']
+        served = self.stats['hits'] + self.stats['stale_hits']
+        
+        return {
+            **self.stats,
+            'entries': len(self._entries),
+            'in_flight': len(self._in_flight),
+            'hit_rate': served / lookups if lookups else 0.0
+        }
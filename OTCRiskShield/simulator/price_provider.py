@@ -0,0 +1,225 @@
+"""
+Price provider interface, tape replay provider and price monitoring loop
+"""
+
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Protocol, Tuple, runtime_checkable
+
+from .clock import Clock, SystemClock
+from .price_series import PriceSeries
+from .price_tape import PriceTape
+
+logger = logging.getLogger(__name__)
+
+@runtime_checkable
+class PriceProvider(Protocol):
+    """Source of token prices used by the simulator"""
+    
+    async def get_token_price(self, token_symbol: str,
+                              max_age: Optional[float] = None) -> Optional[float]:
+        """Get the current USD price of a token, or None if unavailable"""
+        ...
+    
+    async def get_token_prices(self, symbols: Iterable[str]) -> Dict[str, Optional[float]]:
+        """Get current USD prices for several tokens"""
+        ...
+
+class TapeReplayProvider:
+    """
+    Serves recorded ticks from a price tape, one tick per lookup
+    
+    Replay is driven by calls, not by time: the tape's timestamps and the
+    clock are not consulted, so each polling lookup serves the token's next
+    tick whatever the quote interval. Tapes should be recorded (or
+    generated) at the interval they are replayed with.
+    """
+    
+    def __init__(self, tape: PriceTape, loop: bool = True):
+        self.tape = tape
+        self.loop = loop
+        self._cursors: Dict[str, int] = {}
+    
+    @classmethod
+    def from_file(cls, path: str, loop: bool = True) -> 'TapeReplayProvider':
+        """Open a tape file for replay"""
+        return cls(PriceTape(path), loop=loop)
+    
+    async def get_token_price(self, token_symbol: str,
+                              max_age: Optional[float] = None) -> Optional[float]:
+        """
+        Get the next recorded price for a token
+        
+        Each lookup advances the token's cursor by one tick. At the end of
+        the tape the cursor wraps around when looping, otherwise the last
+        price is repeated.
+        
+        Args:
+            token_symbol: Token symbol (e.g., 'SOL')
+            max_age: If set, a recent price is acceptable, so the tick last
+                served is returned without advancing the cursor
+            
+        Returns:
+            Recorded price in USD or None if the token is not on the tape
+        """
+        if max_age is not None:
+            return self._current_price(token_symbol)
+        return self._next_price(token_symbol)
+    
+    async def get_token_prices(self, symbols: Iterable[str]) -> Dict[str, Optional[float]]:
+        """Get the next recorded price for several tokens"""
+        return {symbol: self._next_price(symbol) for symbol in dict.fromkeys(symbols)}
+    
+    def _next_price(self, token_symbol: str) -> Optional[float]:
+        """Return the tick under the cursor and advance it"""
+        series = self.tape.get_series(token_symbol)
+        if series is None or len(series[1]) == 0:
+            return None
+        
+        prices = series[1]
+        symbol = token_symbol.upper()
+        index = self._cursors.get(symbol, 0)
+        
+        if index >= len(prices):
+            index = 0 if self.loop else len(prices) - 1
+        
+        self._cursors[symbol] = index + 1
+        return prices[index]
+    
+    def _current_price(self, token_symbol: str) -> Optional[float]:
+        """Return the tick last served (the first tick if none was) without advancing"""
+        series = self.tape.get_series(token_symbol)
+        if series is None or len(series[1]) == 0:
+            return None
+        
+        prices = series[1]
+        index = self._cursors.get(token_symbol.upper(), 0) - 1
+        return prices[min(max(index, 0), len(prices) - 1)]
+    
+    def reset(self):
+        """Rewind every token to the start of the tape"""
+        self._cursors.clear()
+    
+    def close(self):
+        """Close the underlying tape"""
+        self.tape.close()
+
+async def monitor_price_changes(provider: PriceProvider, token_symbol: str, duration: float,
+                                quote_interval: float, clock: Optional[Clock] = None,
+                                on_tick: Optional[Callable[[float, Dict[str, float]], None]] = None
+                                ) -> Tuple[float, float, PriceSeries]:
+    """
+    Monitor price changes over a duration
+    
+    Args:
+        provider: Price source to poll
+        token_symbol: Token to monitor
+        duration: Duration to monitor in seconds
+        quote_interval: Seconds between price checks
+        clock: Time source for sleeps and timestamps (wall clock if None)
+        on_tick: Called with (timestamp, {token_symbol: price}) for every
+            price fetched, including the initial one
+        
+    Returns:
+        Tuple of (initial_price, final_price, price_history)
+    """
+    price_history = PriceSeries()
+    clock = clock or SystemClock()
+    start_time = clock.time()
+    
+    # Get initial price
+    initial_price = await provider.get_token_price(token_symbol)
+    if initial_price is None:
+        raise ValueError(f"Could not get initial price for {token_symbol}")
+    
+    price_history.append(_to_ns(start_time), initial_price)
+    if on_tick:
+        on_tick(start_time, {token_symbol: initial_price})
+    
+    logger.info(f"Starting price monitoring for {token_symbol} at ${initial_price:.6f}")
+    
+    # Monitor price changes
+    elapsed = 0
+    while elapsed < duration:
+        await clock.sleep(quote_interval)
+        
+        current_price = await provider.get_token_price(token_symbol)
+        now = clock.time()
+        if current_price is not None:
+            price_history.append(_to_ns(now), current_price)
+            if on_tick:
+                on_tick(now, {token_symbol: current_price})
+            
+            change_pct = ((current_price - initial_price) / initial_price) * 100
+            logger.debug(f"Price update: ${current_price:.6f} ({change_pct:+.4f}%)")
+        
+        elapsed = now - start_time
+    
+    # Get final price
+    final_price = price_history.last_price
+    
+    total_change = ((final_price - initial_price) / initial_price) * 100
+    logger.info(f"Price monitoring complete: ${initial_price:.6f} -> ${final_price:.6f} ({total_change:+.4f}%)")
+    
+    return initial_price, final_price, price_history
+
+async def monitor_prices_batch(provider: PriceProvider, symbols: List[str], duration: float,
+                               quote_interval: float, clock: Optional[Clock] = None,
+                               on_tick: Optional[Callable[[float, Dict[str, float]], None]] = None
+                               ) -> Dict[str, Tuple[float, float, PriceSeries]]:
+    """
+    Monitor several tokens in one polling loop, fetching them as a batch each tick
+    
+    Args:
+        provider: Price source to poll
+        symbols: Tokens to monitor
+        duration: Duration to monitor in seconds
+        quote_interval: Seconds between price checks
+        clock: Time source for sleeps and timestamps (wall clock if None)
+        on_tick: Called with (timestamp, prices) for every batch of prices
+            fetched, so listeners see aligned cross-token ticks as they arrive
+        
+    Returns:
+        Mapping of symbol to (initial_price, final_price, price_history) for
+        every token whose initial price was available
+    """
+    clock = clock or SystemClock()
+    start_time = clock.time()
+    
+    # Get initial prices
+    initial_prices = await provider.get_token_prices(symbols)
+    histories = {}
+    for symbol in symbols:
+        if initial_prices.get(symbol) is None:
+            logger.warning(f"Could not get initial price for {symbol}, skipping")
+            continue
+        histories[symbol] = PriceSeries()
+        histories[symbol].append(_to_ns(start_time), initial_prices[symbol])
+    if on_tick and histories:
+        on_tick(start_time, {symbol: initial_prices[symbol] for symbol in histories})
+    
+    logger.info(f"Starting batch price monitoring for {len(histories)} tokens")
+    
+    # Monitor price changes
+    elapsed = 0
+    while elapsed < duration and histories:
+        await clock.sleep(quote_interval)
+        
+        current_prices = await provider.get_token_prices(list(histories))
+        now = clock.time()
+        for symbol, history in histories.items():
+            current_price = current_prices.get(symbol)
+            if current_price is not None:
+                history.append(_to_ns(now), current_price)
+        if on_tick:
+            on_tick(now, {symbol: price for symbol, price in current_prices.items()
+                          if symbol in histories and price is not None})
+        
+        elapsed = now - start_time
+    
+    logger.info(f"Batch price monitoring complete for {len(histories)} tokens")
+    
+    return {symbol: (history.first_price, history.last_price, history)
+            for symbol, history in histories.items()}
+
+def _to_ns(timestamp: float) -> int:
+    return int(timestamp * 1e9)
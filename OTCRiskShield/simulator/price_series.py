@@ -0,0 +1,157 @@
+"""
+Compact price series: int64 nanosecond timestamps and float64 prices
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+class PriceSeries:
+    """
+    Append-only columnar series of (timestamp, price) ticks
+    
+    Ticks live in two NumPy columns that grow geometrically, so appends are
+    amortized O(1) and slices are zero-copy views. Indexing and iteration
+    still produce ``{'timestamp': iso, 'price': p}`` dicts on demand for
+    code written against the old list-of-dicts history.
+    """
+    
+    __slots__ = ('_timestamps', '_prices', '_length', '_frozen')
+    
+    def __init__(self, timestamps_ns: Optional[Iterable[int]] = None,
+                 prices: Optional[Iterable[float]] = None, capacity: int = 16):
+        """
+        Args:
+            timestamps_ns: Initial tick times in nanoseconds since the epoch
+            prices: Initial tick prices
+            capacity: Ticks to allocate up front
+        """
+        timestamps = np.asarray([] if timestamps_ns is None else timestamps_ns, dtype=np.int64)
+        values = np.asarray([] if prices is None else prices, dtype=np.float64)
+        if len(timestamps) != len(values):
+            raise ValueError("timestamps and prices must have the same length")
+        
+        self._length = len(values)
+        self._timestamps = np.empty(max(capacity, self._length), dtype=np.int64)
+        self._prices = np.empty(max(capacity, self._length), dtype=np.float64)
+        self._timestamps[:self._length] = timestamps
+        self._prices[:self._length] = values
+        self._frozen = False
+    
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'PriceSeries':
+        """Build a series from ``{'timestamp': iso, 'price': p}`` dicts"""
+        records = list(records)
+        timestamps = [int(datetime.fromisoformat(r['timestamp']).timestamp() * 1e9) for r in records]
+        return cls(timestamps, [r['price'] for r in records])
+    
+    @classmethod
+    def coerce(cls, history: Union['PriceSeries', Iterable[Dict]]) -> 'PriceSeries':
+        """Return the history as a PriceSeries, converting a list of dicts if needed"""
+        return history if isinstance(history, cls) else cls.from_records(history)
+    
+    @classmethod
+    def _view(cls, timestamps: np.ndarray, prices: np.ndarray) -> 'PriceSeries':
+        """Wrap existing columns without copying; the view is read-only"""
+        series = cls.__new__(cls)
+        series._timestamps = timestamps
+        series._prices = prices
+        series._length = len(prices)
+        series._frozen = True
+        return series
+    
+    def append(self, timestamp_ns: int, price: float):
+        """Add a tick at the end of the series"""
+        if self._frozen:
+            raise TypeError("Cannot append to a PriceSeries slice")
+        
+        if self._length == len(self._prices):
+            capacity = max(16, 2 * self._length)
+            self._timestamps = np.resize(self._timestamps, capacity)
+            self._prices = np.resize(self._prices, capacity)
+        
+        self._timestamps[self._length] = timestamp_ns
+        self._prices[self._length] = price
+        self._length += 1
+    
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Tick times in nanoseconds (a view, not a copy)"""
+        return self._timestamps[:self._length]
+    
+    @property
+    def prices(self) -> np.ndarray:
+        """Tick prices (a view, not a copy)"""
+        return self._prices[:self._length]
+    
+    @property
+    def first_price(self) -> float:
+        return float(self._prices[0])
+    
+    @property
+    def last_price(self) -> float:
+        return float(self._prices[self._length - 1])
+    
+    def window(self, duration: float) -> 'PriceSeries':
+        """
+        Leading ticks a monitoring loop of ``duration`` seconds would have seen
+        
+        Ticks are kept up to and including the first one at or after
+        ``duration`` seconds from the first tick.
+        
+        Args:
+            duration: Window length in seconds
+        
+        Returns:
+            Zero-copy slice of this series
+        """
+        if not self._length:
+            return self[:0]
+        
+        offsets = self.timestamps - self._timestamps[0]
+        end = int(np.searchsorted(offsets, int(duration * 1e9), side='left')) + 1
+        return self[:min(end, self._length)]
+    
+    def to_records(self) -> List[Dict]:
+        """Expand into the ``{'timestamp': iso, 'price': p}`` list format"""
+        return [{'timestamp': _isoformat(ts), 'price': price}
+                for ts, price in zip(self.timestamps.tolist(), self.prices.tolist())]
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            return self._view(self._timestamps[start:stop:step], self._prices[start:stop:step])
+        
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("PriceSeries index out of range")
+        return {'timestamp': _isoformat(int(self._timestamps[index])),
+                'price': float(self._prices[index])}
+    
+    def __iter__(self) -> Iterator[Dict]:
+        for ts, price in zip(self.timestamps.tolist(), self.prices.tolist()):
+            yield {'timestamp': _isoformat(ts), 'price': price}
+    
+    def __repr__(self) -> str:
+        return f"PriceSeries({self._length} ticks)"
+
+def _isoformat(timestamp_ns: int) -> str:
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+
+def json_default(obj):
+    """``json.dumps`` default that expands price series and falls back to ``str``"""
+    if isinstance(obj, PriceSeries):
+        return obj.to_records()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+def to_json(obj, **kwargs) -> str:
+    """Serialize results that may contain price series"""
+    return json.dumps(obj, default=json_default, **kwargs)
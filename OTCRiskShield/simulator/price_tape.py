@@ -0,0 +1,298 @@
+"""
+Compact binary price tapes
+
+A tape is a header followed by columnar chunks. Each chunk holds the ticks
+of one token: a little-endian header (symbol length, tick count), the
+symbol padded to 8 bytes, then `count` int64 timestamps in nanoseconds and
+`count` float64 prices. Readers memory-map the file and view the columns
+in place.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import Config
+
+TAPE_MAGIC = b"OTCTAPE1"
+CHUNK_HEADER = struct.Struct("<HxxI")  # symbol length, tick count
+
+def _padded(length: int) -> int:
+    """Round a byte length up to 8-byte alignment"""
+    return (length + 7) & ~7
+
+def _column_bytes(values: Sequence, typecode: str) -> bytes:
+    """Get the raw little-endian bytes of a numeric column"""
+    if isinstance(values, array) and values.typecode == typecode:
+        return values.tobytes()
+    
+    # Contiguous buffers (memoryviews, NumPy arrays) are copied in one go
+    formats = {"q": ("q", "l"), "d": ("d",)}[typecode]
+    try:
+        view = memoryview(values)
+        if view.itemsize == 8 and view.c_contiguous and view.format.lstrip("<=@") in formats:
+            return view.tobytes()
+    except TypeError:
+        pass
+    
+    return array(typecode, values).tobytes()
+
+def encode_chunk(symbol: str, timestamps: Sequence[int], prices: Sequence[float]) -> bytes:
+    """
+    Encode one token's ticks as a tape chunk
+    
+    Args:
+        symbol: Token symbol
+        timestamps: Tick timestamps in nanoseconds since the epoch
+        prices: Tick prices in USD
+        
+    Returns:
+        Chunk bytes ready to append to a tape
+    """
+    if len(timestamps) != len(prices):
+        raise ValueError("Timestamps and prices must have the same length")
+    
+    name = symbol.upper().encode("utf-8")
+    
+    return b"".join([
+        CHUNK_HEADER.pack(len(name), len(prices)),
+        name.ljust(_padded(len(name)), b"\0"),
+        _column_bytes(timestamps, "q"),
+        _column_bytes(prices, "d")
+    ])
+
+def write_tape(path: str, series: Dict[str, Tuple[Sequence[int], Sequence[float]]]):
+    """
+    Write a complete tape with one chunk per token
+    
+    Args:
+        path: Output file path
+        series: Mapping of symbol to (timestamps_ns, prices)
+    """
+    with open(path, "wb") as f:
+        f.write(TAPE_MAGIC)
+        for symbol, (timestamps, prices) in series.items():
+            f.write(encode_chunk(symbol, timestamps, prices))
+
+class PriceTape:
+    """Memory-mapped, read-only view of a price tape"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._chunks: Dict[str, List[Tuple[memoryview, memoryview]]] = {}
+        self._series: Dict[str, Tuple[Sequence[int], Sequence[float]]] = {}
+        self._index()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _index(self):
+        """Locate every chunk without copying tick data"""
+        view = memoryview(self._mmap)
+        if bytes(view[:len(TAPE_MAGIC)]) != TAPE_MAGIC:
+            raise ValueError(f"{self.path} is not a price tape")
+        
+        offset = len(TAPE_MAGIC)
+        while offset + CHUNK_HEADER.size <= len(view):
+            name_length, count = CHUNK_HEADER.unpack_from(view, offset)
+            offset += CHUNK_HEADER.size
+            
+            symbol = bytes(view[offset:offset + name_length]).decode("utf-8")
+            offset += _padded(name_length)
+            
+            column_size = count * 8
+            if offset + 2 * column_size > len(view):
+                # Truncated trailing chunk from an interrupted writer
+                break
+            
+            timestamps = view[offset:offset + column_size].cast("q")
+            prices = view[offset + column_size:offset + 2 * column_size].cast("d")
+            offset += 2 * column_size
+            
+            self._chunks.setdefault(symbol, []).append((timestamps, prices))
+    
+    @property
+    def symbols(self) -> List[str]:
+        """Symbols present on the tape"""
+        return list(self._chunks)
+    
+    def iter_chunks(self) -> Iterator[Tuple[str, memoryview, memoryview]]:
+        """
+        Walk the tape chunk by chunk, each symbol's chunks in file order
+        
+        Yields:
+            Tuples of (symbol, timestamps_ns, prices) viewing the mapped file
+        """
+        for symbol, chunks in self._chunks.items():
+            for timestamps, prices in chunks:
+                yield symbol, timestamps, prices
+    
+    def get_series(self, symbol: str) -> Optional[Tuple[Sequence[int], Sequence[float]]]:
+        """
+        Get all ticks for a symbol
+        
+        Single-chunk symbols are returned as views into the mapped file;
+        symbols spread over several chunks are joined once and kept.
+        
+        Args:
+            symbol: Token symbol
+            
+        Returns:
+            Tuple of (timestamps_ns, prices) or None if the symbol is absent
+        """
+        symbol = symbol.upper()
+        if symbol in self._series:
+            return self._series[symbol]
+        
+        chunks = self._chunks.get(symbol)
+        if not chunks:
+            return None
+        
+        if len(chunks) == 1:
+            series = chunks[0]
+        else:
+            timestamps, prices = array("q"), array("d")
+            for chunk_timestamps, chunk_prices in chunks:
+                timestamps.frombytes(chunk_timestamps.cast("B"))
+                prices.frombytes(chunk_prices.cast("B"))
+            series = (timestamps, prices)
+        
+        self._series[symbol] = series
+        return series
+    
+    def close(self):
+        """Release views and unmap the file"""
+        self._series.clear()
+        for chunks in self._chunks.values():
+            for timestamps, prices in chunks:
+                timestamps.release()
+                prices.release()
+        self._chunks.clear()
+        self._mmap.close()
+        self._file.close()
+
+class TapeRecorder:
+    """Append-only recorder writing observed ticks to rotating tape files"""
+    
+    def __init__(self, directory: str, prefix: str = "prices", flush_ticks: int = 4096,
+                 rotate_bytes: int = 64 * 1024 * 1024, rotate_seconds: float = 3600.0,
+                 flush_seconds: float = 5.0):
+        self.directory = directory
+        self.prefix = prefix
+        self.flush_ticks = flush_ticks
+        self.flush_seconds = flush_seconds
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.logger = logging.getLogger(__name__)
+        
+        self._buffers: Dict[str, Tuple[array, array]] = {}
+        self._buffered = 0
+        self._buffered_since = 0.0
+        self._file = None
+        self._file_bytes = 0
+        self._opened_at = 0.0
+        self.paths: List[str] = []
+        self.ticks_recorded = 0
+        
+        os.makedirs(directory, exist_ok=True)
+    
+    @classmethod
+    def from_config(cls, config: Config) -> Optional['TapeRecorder']:
+        """Create a recorder if tape recording is configured"""
+        if not config.record_tape_dir:
+            return None
+        return cls(
+            config.record_tape_dir,
+            flush_ticks=config.tape_flush_ticks,
+            rotate_bytes=config.tape_rotate_bytes,
+            rotate_seconds=config.tape_rotate_seconds,
+            flush_seconds=config.tape_flush_seconds
+        )
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def record(self, symbol: str, price: float, timestamp_ns: Optional[int] = None):
+        """
+        Buffer one observed tick
+        
+        Args:
+            symbol: Token symbol
+            price: Observed price in USD
+            timestamp_ns: Observation time in nanoseconds (defaults to now)
+        """
+        symbol = symbol.upper()
+        buffer = self._buffers.get(symbol)
+        if buffer is None:
+            buffer = self._buffers[symbol] = (array("q"), array("d"))
+        
+        buffer[0].append(time.time_ns() if timestamp_ns is None else timestamp_ns)
+        buffer[1].append(price)
+        if not self._buffered:
+            self._buffered_since = time.monotonic()
+        self._buffered += 1
+        self.ticks_recorded += 1
+        
+        # Slow feeds are flushed by age too, which bounds both the ticks lost
+        # on a crash and how far rotate_seconds can be overshot
+        if (self._buffered >= self.flush_ticks
+                or time.monotonic() - self._buffered_since >= self.flush_seconds):
+            self.flush()
+    
+    def flush(self):
+        """Write every buffered tick as one chunk per token"""
+        if not self._buffered:
+            return
+        
+        if self._file is None:
+            self._open_next_file()
+        
+        data = b"".join(encode_chunk(symbol, timestamps, prices)
+                        for symbol, (timestamps, prices) in self._buffers.items()
+                        if prices)
+        self._file.write(data)
+        self._file.flush()
+        self._file_bytes += len(data)
+        
+        self._buffers.clear()
+        self._buffered = 0
+        
+        if (self._file_bytes >= self.rotate_bytes
+                or time.monotonic() - self._opened_at >= self.rotate_seconds):
+            self._close_file()
+    
+    def _open_next_file(self):
+        """Start a new tape file"""
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{len(self.paths):04d}.tape")
+        
+        self._file = open(path, "wb")
+        self._file.write(TAPE_MAGIC)
+        self._file_bytes = len(TAPE_MAGIC)
+        self._opened_at = time.monotonic()
+        self.paths.append(path)
+        
+        self.logger.info(f"Recording price tape to {path}")
+    
+    def _close_file(self):
+        """Close the current tape file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def close(self):
+        """Flush buffered ticks and close the current tape"""
+        self.flush()
+        self._close_file()
@@ -0,0 +1,46 @@
+"""
+Token-bucket rate limiter shared by concurrent price requests
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from .config import Config
+
+class AsyncRateLimiter:
+    """Limits how many requests start per second across all tasks"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waits = 0
+    
+    @classmethod
+    def from_config(cls, config: Config) -> Optional['AsyncRateLimiter']:
+        """Create a limiter if a request rate limit is configured"""
+        if not config.rate_limit:
+            return None
+        return cls(config.rate_limit, config.rate_limit_burst)
+    
+    async def acquire(self):
+        """Wait until a request may start"""
+        # Waiters queue on the lock, so requests start in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                self.waits += 1
+                await asyncio.sleep((1 - self._tokens) / self.rate)
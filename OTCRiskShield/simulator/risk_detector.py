@@ -3,9 +3,13 @@ Risk detection algorithms for front-running analysis
 """
 
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime
+
+import numpy as np
+
 from .config import Config
+from .price_series import PriceSeries
 
 class RiskDetector:
     """Detects front-running risks based on price movements"""
@@ -144,12 +148,12 @@ class RiskDetector:
         """Get details from the last risk analysis"""
         return self.last_analysis
     
-    def analyze_price_history(self, price_history: List[Dict]) -> Dict:
+    def analyze_price_history(self, price_history: Union[PriceSeries, List[Dict]]) -> Dict:
         """
         Analyze price movement patterns in history
         
         Args:
-            price_history: List of price data points with timestamp and price
+            price_history: Price series, or list of price data points with timestamp and price
             
         Returns:
             Analysis of price patterns
@@ -157,49 +161,37 @@ class RiskDetector:
         if len(price_history) < 2:
             return {'error': 'Insufficient price data'}
         
-        prices = [p['price'] for p in price_history]
+        series = PriceSeries.coerce(price_history)
+        prices = series.prices
         
         # Calculate price volatility
-        price_changes = []
-        for i in range(1, len(prices)):
-            change = (prices[i] - prices[i-1]) / prices[i-1]
-            price_changes.append(change)
-        
-        volatility = self._calculate_volatility(price_changes)
+        price_changes = np.diff(prices) / prices[:-1]
+        volatility = float(price_changes.std())
         
         # Detect trends
-        trend = self._detect_trend(prices)
+        trend = self._detect_trend([series.first_price, series.last_price])
         
         # Find maximum price movement
-        max_price = max(prices)
-        min_price = min(prices)
-        max_movement = (max_price - min_price) / prices[0]
+        max_price = float(prices.max())
+        min_price = float(prices.min())
+        max_movement = (max_price - min_price) / series.first_price
         
         analysis = {
-            'total_data_points': len(price_history),
+            'total_data_points': len(series),
             'price_range': {
                 'min': min_price,
                 'max': max_price,
-                'initial': prices[0],
-                'final': prices[-1]
+                'initial': series.first_price,
+                'final': series.last_price
             },
             'volatility': volatility,
             'max_movement_pct': max_movement * 100,
             'trend': trend,
-            'risk_periods': self._identify_risk_periods(price_history)
+            'risk_periods': self._identify_risk_periods(series, price_changes)
         }
         
         return analysis
     
-    def _calculate_volatility(self, changes: List[float]) -> float:
-        """Calculate volatility from price changes"""
-        if not changes:
-            return 0.0
-        
-        mean = sum(changes) / len(changes)
-        variance = sum((x - mean) ** 2 for x in changes) / len(changes)
-        return variance ** 0.5
-    
     def _detect_trend(self, prices: List[float]) -> str:
         """Detect overall price trend"""
         if len(prices) < 2:
@@ -216,22 +208,18 @@ class RiskDetector:
         else:
             return 'sideways'
     
-    def _identify_risk_periods(self, price_history: List[Dict]) -> List[Dict]:
+    def _identify_risk_periods(self, series: PriceSeries, price_changes: np.ndarray) -> List[Dict]:
         """Identify periods with high risk of front-running"""
         risk_periods = []
         
-        for i in range(1, len(price_history)):
-            prev_price = price_history[i-1]['price']
-            curr_price = price_history[i]['price']
-            
-            change = abs((curr_price - prev_price) / prev_price)
-            
-            if change > self.config.threshold:
-                risk_periods.append({
-                    'start_time': price_history[i-1]['timestamp'],
-                    'end_time': price_history[i]['timestamp'],
-                    'price_change_pct': change * 100,
-                    'direction': 'up' if curr_price > prev_price else 'down'
-                })
+        # Only the ticks that crossed the threshold are expanded to dicts
+        for i in np.flatnonzero(np.abs(price_changes) > self.config.threshold):
+            change = float(price_changes[i])
+            risk_periods.append({
+                'start_time': series[int(i)]['timestamp'],
+                'end_time': series[int(i) + 1]['timestamp'],
+                'price_change_pct': abs(change) * 100,
+                'direction': 'up' if change > 0 else 'down'
+            })
         
         return risk_periods
@@ -0,0 +1,134 @@
+"""
+Incremental rolling-window statistics over price ticks
+"""
+
+import math
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+class RollingVolatility:
+    """
+    Sample standard deviation of tick-to-tick returns over a sliding time window
+    
+    Keeps running sums of the returns in the window, so adding a tick and
+    reading the volatility are O(1) amortized. A return belongs to the window
+    while the tick it starts from is inside it, matching a recomputation over
+    the window's ticks.
+    """
+    
+    def __init__(self, window_seconds: float):
+        """
+        Args:
+            window_seconds: Window length in seconds
+        """
+        self.window_seconds = window_seconds
+        self._returns = deque()  # (start tick timestamp, return)
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._updates = 0
+        self._last_price: Optional[float] = None
+        self._last_timestamp: Optional[float] = None
+    
+    @classmethod
+    def from_ticks(cls, window_seconds: float, timestamps: np.ndarray,
+                   prices: np.ndarray) -> 'RollingVolatility':
+        """Seed an accumulator from existing ticks, oldest first"""
+        rolling = cls(window_seconds)
+        if len(prices):
+            returns = np.diff(prices) / prices[:-1]
+            rolling._returns.extend(zip(timestamps[:-1].tolist(), returns.tolist()))
+            rolling._resync()
+            rolling._last_price = float(prices[-1])
+            rolling._last_timestamp = float(timestamps[-1])
+        return rolling
+    
+    def __len__(self) -> int:
+        return len(self._returns)
+    
+    def add(self, timestamp: float, price: float):
+        """Fold in a new tick"""
+        if self._last_price is not None:
+            value = (price - self._last_price) / self._last_price
+            self._returns.append((self._last_timestamp, value))
+            self._sum += value
+            self._sum_sq += value * value
+            self._updates += 1
+        self._last_price = price
+        self._last_timestamp = timestamp
+    
+    def evict_before(self, timestamp: float):
+        """Drop returns that start before ``timestamp``"""
+        returns = self._returns
+        while returns and returns[0][0] < timestamp:
+            _, value = returns.popleft()
+            self._sum -= value
+            self._sum_sq -= value * value
+            self._updates += 1
+        
+        # Running sums drift as values come and go; rebuild them now and then
+        if self._updates > 2 * len(returns) + 1024:
+            self._resync()
+    
+    def volatility(self, now: float) -> float:
+        """Sample standard deviation of the returns in the window ending at ``now``"""
+        self.evict_before(now - self.window_seconds)
+        n = len(self._returns)
+        if n < 2:
+            return 0.0
+        variance = (self._sum_sq - self._sum * self._sum / n) / (n - 1)
+        return math.sqrt(variance) if variance > 0 else 0.0
+    
+    def expires_at(self) -> float:
+        """Time at which the oldest return leaves the window"""
+        if not self._returns:
+            return math.inf
+        return self._returns[0][0] + self.window_seconds
+    
+    def _resync(self):
+        values = [value for _, value in self._returns]
+        self._sum = math.fsum(values)
+        self._sum_sq = math.fsum(value * value for value in values)
+        self._updates = 0
+
+class RollingExtremes:
+    """
+    Rolling minimum and maximum price over a time horizon
+    
+    Monotonic deques keep only the ticks that can still become the window's
+    min or max, so each tick costs O(1) amortized and both extremes are read
+    from the front of their deque.
+    """
+    
+    def __init__(self, horizon_seconds: float):
+        """
+        Args:
+            horizon_seconds: Window length in seconds
+        """
+        self.horizon_seconds = horizon_seconds
+        self._min = deque()  # (timestamp, price), prices increasing
+        self._max = deque()  # (timestamp, price), prices decreasing
+    
+    def add(self, timestamp: float, price: float):
+        """Fold in a tick and drop ticks that left the window"""
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((timestamp, price))
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((timestamp, price))
+        
+        cutoff = timestamp - self.horizon_seconds
+        while self._min[0][0] < cutoff:
+            self._min.popleft()
+        while self._max[0][0] < cutoff:
+            self._max.popleft()
+    
+    @property
+    def min(self) -> float:
+        return self._min[0][1]
+    
+    @property
+    def max(self) -> float:
+        return self._max[0][1]
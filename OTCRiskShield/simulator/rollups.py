@@ -0,0 +1,198 @@
+"""
+Multi-resolution OHLC rollups of price ticks
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+class OHLCRollup:
+    """
+    Time-bucketed open/high/low/close bars at one resolution
+    
+    Bars are updated in place as ticks arrive, so each tick costs O(1) and a
+    window query touches one bar per ``resolution`` seconds instead of every
+    tick. Ticks must arrive in time order.
+    """
+    
+    COLUMNS = ('starts', 'opens', 'highs', 'lows', 'closes', 'counts')
+    
+    def __init__(self, resolution: float, initial_size: int = 64):
+        """
+        Args:
+            resolution: Bar length in seconds
+            initial_size: Bars allocated up front
+        """
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+        
+        self.resolution = resolution
+        self._columns = {name: np.empty(initial_size, dtype=np.float64) for name in self.COLUMNS}
+        self._start = 0
+        self._end = 0
+    
+    def __len__(self) -> int:
+        return self._end - self._start
+    
+    def add(self, timestamp: float, price: float):
+        """Fold a tick into the current bar, opening a new one on a bucket boundary"""
+        bucket = timestamp - timestamp % self.resolution
+        columns = self._columns
+        last = self._end - 1
+        
+        if self._end > self._start and columns['starts'][last] == bucket:
+            columns['highs'][last] = max(columns['highs'][last], price)
+            columns['lows'][last] = min(columns['lows'][last], price)
+            columns['closes'][last] = price
+            columns['counts'][last] += 1
+            return
+        
+        if self._end == len(columns['starts']):
+            self._reserve(1)
+        for name, value in zip(self.COLUMNS, (bucket, price, price, price, price, 1.0)):
+            columns[name][self._end] = value
+        self._end += 1
+    
+    def extend(self, timestamps: np.ndarray, prices: np.ndarray):
+        """Fold many ticks in at once, oldest first (vectorized per bucket)"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if not len(prices):
+            return
+        
+        buckets = timestamps - timestamps % self.resolution
+        
+        # A leading run in the current bar is merged tick by tick
+        if len(self):
+            merge = int(np.searchsorted(buckets, self._columns['starts'][self._end - 1], side='right'))
+            for timestamp, price in zip(timestamps[:merge].tolist(), prices[:merge].tolist()):
+                self.add(timestamp, price)
+            buckets, prices = buckets[merge:], prices[merge:]
+            if not len(prices):
+                return
+        
+        firsts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        lasts = np.r_[firsts[1:] - 1, len(prices) - 1]
+        bars = {
+            'starts': buckets[firsts],
+            'opens': prices[firsts],
+            'highs': np.maximum.reduceat(prices, firsts),
+            'lows': np.minimum.reduceat(prices, firsts),
+            'closes': prices[lasts],
+            'counts': (lasts - firsts + 1).astype(np.float64)
+        }
+        
+        n = len(firsts)
+        self._reserve(n)
+        for name in self.COLUMNS:
+            self._columns[name][self._end:self._end + n] = bars[name]
+        self._end += n
+    
+    def drop_before(self, timestamp: float):
+        """Discard bars that end at or before ``timestamp``"""
+        starts = self._columns['starts'][self._start:self._end]
+        self._start += int(np.searchsorted(starts, timestamp - self.resolution, side='right'))
+    
+    def count_since(self, since: float) -> int:
+        """Number of bars overlapping the window starting at ``since``"""
+        starts = self._columns['starts'][self._start:self._end]
+        return len(starts) - int(np.searchsorted(starts, since - self.resolution, side='right'))
+    
+    def window(self, since: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Bars overlapping the window starting at ``since``, oldest first
+        
+        Args:
+            since: Window start in epoch seconds (None for every bar)
+        
+        Returns:
+            Dict of column arrays (starts, opens, highs, lows, closes, counts);
+            the arrays are views into the rollup
+        """
+        first = self._start
+        if since is not None:
+            first = self._end - self.count_since(since)
+        return {name: column[first:self._end] for name, column in self._columns.items()}
+    
+    def _reserve(self, n: int):
+        """Make room for ``n`` more bars, compacting dropped bars first"""
+        size = len(self._columns['starts'])
+        if self._end + n <= size:
+            return
+        
+        used = self._end - self._start
+        if used + n > size // 2:
+            size = max(2 * size, used + n)
+        for name, column in self._columns.items():
+            resized = np.empty(size, dtype=np.float64)
+            resized[:used] = column[self._start:self._end]
+            self._columns[name] = resized
+        self._start, self._end = 0, used
+
+class MultiResolutionRollup:
+    """OHLC rollups of one token's ticks at several resolutions, kept in step"""
+    
+    def __init__(self, resolutions: Iterable[float]):
+        """
+        Args:
+            resolutions: Bar lengths in seconds
+        """
+        self.rollups: List[OHLCRollup] = [OHLCRollup(r) for r in sorted(set(resolutions))]
+    
+    def add(self, timestamp: float, price: float):
+        for rollup in self.rollups:
+            rollup.add(timestamp, price)
+    
+    def extend(self, timestamps: np.ndarray, prices: np.ndarray):
+        for rollup in self.rollups:
+            rollup.extend(timestamps, prices)
+    
+    def drop_before(self, timestamp: float):
+        for rollup in self.rollups:
+            rollup.drop_before(timestamp)
+    
+    def select(self, since: float, min_bars: int) -> Optional[OHLCRollup]:
+        """
+        Coarsest rollup with at least ``min_bars`` bars in the window
+        
+        Args:
+            since: Window start in epoch seconds
+            min_bars: Bars needed for a meaningful statistic
+        
+        Returns:
+            The chosen rollup, or None if no resolution is fine enough
+        """
+        for rollup in reversed(self.rollups):
+            if rollup.count_since(since) >= min_bars:
+                return rollup
+        return None
+
+def bar_volatility(bars: Dict[str, np.ndarray]) -> float:
+    """
+    Per-tick return volatility estimated from bar closes
+    
+    Close-to-close bar returns span several ticks each, so their standard
+    deviation is scaled down by the square root of the average number of
+    ticks per bar to stay comparable with tick-to-tick volatility. The
+    scaling assumes tick returns are independent (a random walk); ticks that
+    mean-revert, such as bid/ask bounce, cancel out within a bar and the
+    estimate comes out far below the tick-level volatility. Use it only
+    where the raw ticks are no longer available.
+    
+    Args:
+        bars: Columns from ``OHLCRollup.window``
+    
+    Returns:
+        Sample standard deviation of returns, per tick
+    """
+    closes = bars['closes']
+    if len(closes) < 3:
+        return 0.0
+    
+    returns = np.diff(closes) / closes[:-1]
+    ticks_per_bar = float(bars['counts'][1:].mean())
+    return float(np.std(returns, ddof=1) / np.sqrt(ticks_per_bar))
+
+def bar_trend(bars: Dict[str, np.ndarray]) -> Tuple[float, float, int]:
+    """First open, last close and tick count covered by the bars"""
+    return float(bars['opens'][0]), float(bars['closes'][-1]), int(bars['counts'].sum())
@@ -0,0 +1,121 @@
+"""
+Bounded result streaming and incremental batch analysis
+"""
+
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional
+
+_DONE = object()
+
+async def stream_as_completed(jobs: Iterable[Callable[[], Awaitable]], concurrency: int,
+                              buffer_size: int) -> AsyncIterator:
+    """
+    Run jobs with bounded concurrency and yield their results as they complete
+    
+    At most ``buffer_size`` finished results wait for the consumer; once the
+    buffer is full, workers block before starting another job, so a slow
+    consumer slows the producers instead of growing memory. Closing the
+    generator early cancels the outstanding jobs.
+    
+    Args:
+        jobs: Zero-argument callables returning awaitables
+        concurrency: Jobs allowed to run at once
+        buffer_size: Finished results buffered for the consumer
+    
+    Yields:
+        Job results in completion order
+    """
+    queue = asyncio.Queue(maxsize=max(buffer_size, 1))
+    jobs = iter(jobs)
+    error: Optional[BaseException] = None
+    
+    async def worker():
+        # Workers share one iterator, so each job runs exactly once
+        for job in jobs:
+            await queue.put(await job())
+    
+    async def produce():
+        nonlocal error
+        workers = [asyncio.create_task(worker()) for _ in range(max(concurrency, 1))]
+        try:
+            await asyncio.gather(*workers)
+        except Exception as e:
+            error = e
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        await queue.put(_DONE)
+    
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            yield item
+        if error is not None:
+            raise error
+    finally:
+        if not producer.done():
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+class BatchAnalyzer:
+    """Accumulates batch statistics one result at a time"""
+    
+    def __init__(self):
+        self.total = 0
+        self.successful = 0
+        self.risks_detected = 0
+        self.total_mev = 0.0
+        self.min_change = None
+        self.max_change = None
+        # Welford running mean / sum of squared deviations of price change
+        self._mean_change = 0.0
+        self._m2_change = 0.0
+    
+    def add(self, result: Dict):
+        """Fold one simulation result into the running statistics"""
+        self.total += 1
+        if 'error' in result:
+            return
+        
+        self.successful += 1
+        if result['risk_detected']:
+            self.risks_detected += 1
+        self.total_mev += result['mev_profit']
+        
+        change = result['price_change']
+        self.min_change = change if self.min_change is None else min(self.min_change, change)
+        self.max_change = change if self.max_change is None else max(self.max_change, change)
+        delta = change - self._mean_change
+        self._mean_change += delta / self.successful
+        self._m2_change += delta * (change - self._mean_change)
+    
+    def get_analysis(self) -> Dict:
+        """Summary in the shape of OTCSimulator.analyze_batch_results"""
+        if not self.total:
+            return {'error': 'No results to analyze'}
+        if not self.successful:
+            return {'error': 'No successful simulations'}
+        
+        volatility = (self._m2_change / self.successful) ** 0.5 if self.successful > 1 else 0.0
+        
+        return {
+            'total_simulations': self.total,
+            'successful_simulations': self.successful,
+            'risks_detected': self.risks_detected,
+            'risk_percentage': (self.risks_detected / self.successful) * 100,
+            'total_mev_profit': self.total_mev,
+            'average_mev_per_simulation': self.total_mev / self.successful,
+            'average_mev_per_risk': self.total_mev / self.risks_detected if self.risks_detected > 0 else 0,
+            'price_change_stats': {
+                'min': self.min_change,
+                'max': self.max_change,
+                'average': self._mean_change,
+                'volatility': volatility
+            },
+            'timestamp': datetime.now().isoformat()
+        }
@@ -0,0 +1,173 @@
+"""
+Parameter grid sweeps sharded across worker processes
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .config import Config
+from .synthetic import SyntheticPriceProvider
+
+logger = logging.getLogger(__name__)
+
+# Columns reported for every grid point, after the swept parameters
+RESULT_COLUMNS = [
+    'simulations', 'successful', 'errors', 'risks_detected', 'risk_percentage',
+    'total_mev_profit', 'average_mev_profit', 'min_price_change', 'max_price_change',
+    'average_price_change'
+]
+
+def expand_grid(grid: Dict[str, list]) -> List[Dict]:
+    """
+    Expand a grid spec into every combination of its values
+    
+    Args:
+        grid: Mapping of Config field name to the values to sweep
+    
+    Returns:
+        One dict of field overrides per grid point
+    """
+    config_fields = {f.name for f in fields(Config)}
+    unknown = [name for name in grid if name not in config_fields]
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(unknown)}")
+    
+    names = list(grid)
+    values = [v if isinstance(v, (list, tuple)) else [v] for v in grid.values()]
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+def summarize_point(results: List[Dict]) -> Dict:
+    """Reduce one grid point's trade results to a table row"""
+    successful = [r for r in results if 'error' not in r]
+    risks = sum(1 for r in successful if r['risk_detected'])
+    total_mev = sum(r['mev_profit'] for r in successful)
+    changes = [r['price_change'] for r in successful]
+    
+    return {
+        'simulations': len(results),
+        'successful': len(successful),
+        'errors': len(results) - len(successful),
+        'risks_detected': risks,
+        'risk_percentage': risks / len(successful) * 100 if successful else 0.0,
+        'total_mev_profit': total_mev,
+        'average_mev_profit': total_mev / len(successful) if successful else 0.0,
+        'min_price_change': min(changes) if changes else 0.0,
+        'max_price_change': max(changes) if changes else 0.0,
+        'average_price_change': sum(changes) / len(changes) if changes else 0.0
+    }
+
+def _run_shard(base_config: Config, points: List[Dict]) -> List[Dict]:
+    """Worker entry point: simulate a slice of the grid in one event loop"""
+    # Imported here so the module stays cheap to import in the parent
+    from .otc_simulator import OTCSimulator
+    
+    async def run_points() -> List[Dict]:
+        rows = []
+        for point in points:
+            try:
+                simulator = OTCSimulator(replace(base_config, **point))
+                results = await simulator.run_batch_simulation()
+                rows.append(summarize_point(results))
+            except Exception as e:
+                logger.error(f"Sweep point {point} failed: {e}")
+                rows.append(summarize_point([{'error': str(e)}]))
+        return rows
+    
+    return asyncio.run(run_points())
+
+class SweepEngine:
+    """Runs OTC simulations over a parameter grid on a process pool"""
+    
+    def __init__(self, config: Config, workers: Optional[int] = None):
+        """
+        Args:
+            config: Base configuration; grid values override its fields
+            workers: Worker processes (defaults to the number of CPU cores)
+        """
+        self.config = config
+        self.workers = workers or os.cpu_count() or 1
+        self.logger = logging.getLogger(__name__)
+    
+    def run(self, grid: Dict[str, list]) -> Dict:
+        """
+        Simulate every grid point and merge the results column-wise
+        
+        Synthetic prices are written to one tape up front so every worker,
+        and every grid point, replays the same market path.
+        
+        Args:
+            grid: Mapping of Config field name to the values to sweep
+        
+        Returns:
+            Dictionary with the grid size, worker count, execution time and
+            a 'table' mapping each column name to a list of values
+        """
+        points = expand_grid(grid)
+        start_time = datetime.now()
+        
+        with tempfile.TemporaryDirectory(prefix="otc-sweep-") as tmp_dir:
+            base_config = self._shared_tape_config(points, tmp_dir)
+            rows = self._run_points(base_config, points)
+        
+        columns = list(grid) + RESULT_COLUMNS
+        table = {column: [] for column in columns}
+        for point, row in zip(points, rows):
+            for column in columns:
+                table[column].append(point[column] if column in point else row[column])
+        
+        execution_time = (datetime.now() - start_time).total_seconds()
+        self.logger.info(f"Sweep complete: {len(points)} points on {self.workers} workers "
+                         f"in {execution_time:.2f}s")
+        
+        return {
+            'points': len(points),
+            'workers': self.workers,
+            'execution_time': execution_time,
+            'table': table
+        }
+    
+    def _run_points(self, base_config: Config, points: List[Dict]) -> List[Dict]:
+        """Shard the points across the pool and gather rows in grid order"""
+        if self.workers == 1 or len(points) <= 1:
+            return _run_shard(base_config, points)
+        
+        # A few shards per worker keeps cores busy when point costs differ
+        shard_size = max(1, math.ceil(len(points) / (self.workers * 4)))
+        shards = [points[i:i + shard_size] for i in range(0, len(points), shard_size)]
+        
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(shards))) as pool:
+            results = pool.map(_run_shard, itertools.repeat(base_config), shards)
+            return [row for shard_rows in results for row in shard_rows]
+    
+    def _shared_tape_config(self, points: List[Dict], tmp_dir: str) -> Config:
+        """Pre-generate one synthetic tape so all workers replay the same prices"""
+        if self.config.price_source == "live":
+            self.logger.warning("Sweeping against live prices; points will not share a market path")
+            return self.config
+        if self.config.price_source != "synthetic":
+            return self.config
+        
+        tokens = {point.get('token', self.config.token) for point in points}
+        # Long enough for the hungriest point, which may sweep the delay,
+        # quote interval or iteration count, so replay never wraps around
+        n_ticks = max(
+            (math.ceil(point.get('delay', self.config.delay)
+                       / point.get('quote_interval', self.config.quote_interval)) + 2)
+            * point.get('iterations', self.config.iterations)
+            for point in points
+        )
+        
+        path = os.path.join(tmp_dir, "synthetic.tape")
+        provider = SyntheticPriceProvider.from_config(self.config)
+        # SOL is always needed for gas pricing
+        provider.write_tape(path, sorted(tokens | {"SOL"}), n_ticks + 1)
+        
+        return replace(self.config, price_source="tape", price_tape_path=path)
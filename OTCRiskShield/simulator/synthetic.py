@@ -0,0 +1,241 @@
+"""
+Synthetic price engine generating GBM, jump-diffusion and regime-switching paths
+"""
+
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .config import Config
+from .price_tape import write_tape
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+MODELS = ("gbm", "jump_diffusion", "regime_switching")
+
+@dataclass
+class TokenDynamics:
+    """Per-token price dynamics (annualized rates)"""
+    initial_price: float = 10.0
+    drift: float = 0.0
+    volatility: float = 0.8
+    jump_intensity: float = 0.0  # Expected jumps per year
+    jump_mean: float = 0.0  # Mean log jump size
+    jump_std: float = 0.0  # Log jump size standard deviation
+    regime_vol_multipliers: Tuple[float, float] = (1.0, 3.0)  # Calm, stressed
+    regime_switch_rates: Tuple[float, float] = (50.0, 500.0)  # Calm->stressed, stressed->calm per year
+
+# Rough starting points so offline runs look like the live token set
+DEFAULT_DYNAMICS = {
+    "SOL": TokenDynamics(initial_price=150.0, volatility=0.9, jump_intensity=20.0, jump_std=0.02),
+    "BTC": TokenDynamics(initial_price=60000.0, volatility=0.6, jump_intensity=10.0, jump_std=0.015),
+    "ETH": TokenDynamics(initial_price=3000.0, volatility=0.7, jump_intensity=12.0, jump_std=0.018),
+    "USDC": TokenDynamics(initial_price=1.0, volatility=0.01),
+    "USDT": TokenDynamics(initial_price=1.0, volatility=0.01),
+}
+
+def get_default_dynamics(symbol: str) -> TokenDynamics:
+    """Get default dynamics for a token symbol"""
+    return DEFAULT_DYNAMICS.get(symbol.upper(), TokenDynamics())
+
+def generate_paths(dynamics: TokenDynamics, n_paths: int, n_steps: int, dt: float,
+                   model: str = "gbm", rng: Optional[np.random.Generator] = None,
+                   initial_price: Optional[float] = None) -> np.ndarray:
+    """
+    Generate price paths in bulk
+    
+    Args:
+        dynamics: Token drift, volatility and jump parameters
+        n_paths: Number of independent paths
+        n_steps: Steps per path
+        dt: Step length in years
+        model: 'gbm', 'jump_diffusion' or 'regime_switching'
+        rng: NumPy random generator (a fresh unseeded one if None)
+        initial_price: Starting price (defaults to dynamics.initial_price)
+        
+    Returns:
+        Array of shape (n_paths, n_steps + 1) whose first column is the start price
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unsupported synthetic model: {model}")
+    
+    rng = rng if rng is not None else np.random.default_rng()
+    start = dynamics.initial_price if initial_price is None else initial_price
+    
+    shocks = rng.standard_normal((n_paths, n_steps))
+    
+    if model == "regime_switching":
+        sigma = dynamics.volatility * _simulate_regimes(dynamics, n_paths, n_steps, dt, rng)
+    else:
+        sigma = dynamics.volatility
+    
+    log_returns = (dynamics.drift - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * shocks
+    
+    if model == "jump_diffusion" and dynamics.jump_intensity > 0:
+        # Merton jumps, with the drift compensated so jumps do not bias the mean
+        jump_counts = rng.poisson(dynamics.jump_intensity * dt, (n_paths, n_steps))
+        jump_sizes = (jump_counts * dynamics.jump_mean
+                      + np.sqrt(jump_counts) * dynamics.jump_std * rng.standard_normal((n_paths, n_steps)))
+        compensation = dynamics.jump_intensity * (np.exp(dynamics.jump_mean + 0.5 * dynamics.jump_std ** 2) - 1)
+        log_returns += jump_sizes - compensation * dt
+    
+    paths = np.empty((n_paths, n_steps + 1))
+    paths[:, 0] = 0.0
+    np.cumsum(log_returns, axis=1, out=paths[:, 1:])
+    np.exp(paths, out=paths)
+    paths *= start
+    
+    return paths
+
+def _simulate_regimes(dynamics: TokenDynamics, n_paths: int, n_steps: int, dt: float,
+                      rng: np.random.Generator) -> np.ndarray:
+    """Simulate a two-state Markov regime per path and return volatility multipliers"""
+    calm_to_stressed = 1.0 - np.exp(-dynamics.regime_switch_rates[0] * dt)
+    stressed_to_calm = 1.0 - np.exp(-dynamics.regime_switch_rates[1] * dt)
+    
+    # Start each path in its stationary regime so short horizons still see stress
+    to_stressed, to_calm = dynamics.regime_switch_rates
+    stationary_stressed = to_stressed / (to_stressed + to_calm) if to_stressed + to_calm else 0.0
+    stressed = rng.random(n_paths) < stationary_stressed
+    regimes = np.empty((n_paths, n_steps), dtype=bool)
+    draws = rng.random((n_paths, n_steps))
+    
+    for step in range(n_steps):
+        switch = np.where(stressed, draws[:, step] < stressed_to_calm,
+                          draws[:, step] < calm_to_stressed)
+        stressed ^= switch
+        regimes[:, step] = stressed
+    
+    calm_multiplier, stressed_multiplier = dynamics.regime_vol_multipliers
+    return np.where(regimes, stressed_multiplier, calm_multiplier)
+
+class SyntheticPriceProvider:
+    """Price provider serving one synthetic tick per lookup"""
+    
+    def __init__(self, dynamics: Optional[Dict[str, TokenDynamics]] = None, model: str = "gbm",
+                 step_seconds: float = 0.5, seed: Optional[int] = None, block_size: int = 4096):
+        if model not in MODELS:
+            raise ValueError(f"Unsupported synthetic model: {model}")
+        
+        self.dynamics = {symbol.upper(): d for symbol, d in (dynamics or {}).items()}
+        self.model = model
+        self.step_seconds = step_seconds
+        self.seed = seed
+        self.block_size = block_size
+        
+        self._blocks: Dict[str, np.ndarray] = {}
+        self._cursors: Dict[str, int] = {}
+        self._rngs: Dict[str, np.random.Generator] = {}
+    
+    @classmethod
+    def from_config(cls, config: Config) -> 'SyntheticPriceProvider':
+        """Create a provider from the synthetic settings in a config"""
+        dynamics = {symbol: TokenDynamics(**params)
+                    for symbol, params in config.synthetic_dynamics.items()}
+        return cls(
+            dynamics=dynamics,
+            model=config.synthetic_model,
+            step_seconds=config.quote_interval,
+            seed=config.synthetic_seed
+        )
+    
+    def get_dynamics(self, symbol: str) -> TokenDynamics:
+        """Get the dynamics used for a token"""
+        return self.dynamics.get(symbol.upper()) or get_default_dynamics(symbol)
+    
+    def get_rng(self, symbol: str) -> np.random.Generator:
+        """Get the token's generator; seeded runs are reproducible per token"""
+        symbol = symbol.upper()
+        if symbol not in self._rngs:
+            if self.seed is None:
+                self._rngs[symbol] = np.random.default_rng()
+            else:
+                self._rngs[symbol] = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+        return self._rngs[symbol]
+    
+    def generate_paths(self, symbol: str, n_paths: int, n_steps: int,
+                       step_seconds: Optional[float] = None) -> np.ndarray:
+        """
+        Generate independent price paths for a token
+        
+        Args:
+            symbol: Token symbol
+            n_paths: Number of paths
+            n_steps: Steps per path
+            step_seconds: Step length (defaults to the provider's tick interval)
+            
+        Returns:
+            Array of shape (n_paths, n_steps + 1)
+        """
+        step = self.step_seconds if step_seconds is None else step_seconds
+        return generate_paths(self.get_dynamics(symbol), n_paths, n_steps,
+                              step / SECONDS_PER_YEAR, self.model, self.get_rng(symbol))
+    
+    async def get_token_price(self, token_symbol: str,
+                              max_age: Optional[float] = None) -> Optional[float]:
+        """
+        Get the next synthetic price for a token
+        
+        Args:
+            token_symbol: Token symbol (e.g., 'SOL')
+            max_age: If set, a recent price is acceptable, so the last
+                generated price is returned without stepping the path
+            
+        Returns:
+            Simulated price in USD
+        """
+        if max_age is not None:
+            return self._current_price(token_symbol.upper())
+        return self._next_price(token_symbol.upper())
+    
+    async def get_token_prices(self, symbols: Iterable[str]) -> Dict[str, Optional[float]]:
+        """Get the next synthetic price for several tokens"""
+        return {symbol: self._next_price(symbol.upper()) for symbol in dict.fromkeys(symbols)}
+    
+    def _current_price(self, symbol: str) -> float:
+        """Return the tick last served (the path's start if none was) without stepping"""
+        index = self._cursors.get(symbol, 0)
+        if index == 0:
+            price = self._next_price(symbol)
+            self._cursors[symbol] = 0
+            return price
+        return float(self._blocks[symbol][index - 1])
+    
+    def _next_price(self, symbol: str) -> float:
+        """Return the tick under the cursor, extending the path in blocks"""
+        block = self._blocks.get(symbol)
+        index = self._cursors.get(symbol, 0)
+        
+        if block is None or index >= len(block):
+            last_price = block[-1] if block is not None else None
+            path = generate_paths(self.get_dynamics(symbol), 1, self.block_size,
+                                  self.step_seconds / SECONDS_PER_YEAR, self.model,
+                                  self.get_rng(symbol), initial_price=last_price)
+            # A continued block starts at the previous block's last price
+            block = path[0] if last_price is None else path[0, 1:]
+            self._blocks[symbol] = block
+            index = 0
+        
+        self._cursors[symbol] = index + 1
+        return float(block[index])
+    
+    def write_tape(self, path: str, symbols: Iterable[str], n_ticks: int, start_ns: int = 0):
+        """
+        Generate ticks for several tokens and save them as a price tape
+        
+        Args:
+            path: Output tape path
+            symbols: Token symbols to include
+            n_ticks: Ticks per token
+            start_ns: Timestamp of the first tick in nanoseconds
+        """
+        step_ns = int(self.step_seconds * 1e9)
+        timestamps = np.arange(n_ticks, dtype=np.int64) * step_ns + start_ns
+        
+        series = {}
+        for symbol in dict.fromkeys(s.upper() for s in symbols):
+            prices = self.generate_paths(symbol, 1, n_ticks - 1)[0]
+            series[symbol] = (timestamps, prices)
+        
+        write_tape(path, series)
@@ -0,0 +1,182 @@
+"""
+Fixed-capacity, time-ordered ring buffer of price ticks
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+class TickRingBuffer:
+    """
+    Ring buffer of (timestamp, price, volume) ticks for one token
+    
+    Storage grows geometrically up to ``capacity``, so appends are amortized
+    O(1); once full, the oldest tick is overwritten. Ticks must
+    arrive in time order, which keeps the buffer sorted so window starts are
+    found by binary search and window queries cost O(log n + k).
+    """
+    
+    def __init__(self, capacity: int, initial_size: int = 64):
+        """
+        Args:
+            capacity: Maximum ticks kept before the oldest are overwritten
+            initial_size: Ticks allocated up front
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        
+        self.capacity = capacity
+        size = min(capacity, initial_size)
+        self._timestamps = np.empty(size, dtype=np.float64)
+        self._prices = np.empty(size, dtype=np.float64)
+        self._volumes = np.empty(size, dtype=np.float64)
+        self._start = 0
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def append(self, timestamp: float, price: float, volume: Optional[float] = None):
+        """
+        Add a tick, overwriting the oldest one when full
+        
+        Args:
+            timestamp: Tick time in epoch seconds, not earlier than the last tick
+            price: Tick price
+            volume: Traded volume, if known
+        """
+        if self._size and timestamp < self.last_timestamp:
+            raise ValueError("ticks must be appended in time order")
+        
+        if self._size == len(self._prices) < self.capacity:
+            self._grow()
+        
+        if self._size == self.capacity:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+        else:
+            index = (self._start + self._size) % len(self._prices)
+            self._size += 1
+        
+        self._timestamps[index] = timestamp
+        self._prices[index] = price
+        self._volumes[index] = np.nan if volume is None else volume
+    
+    def extend(self, timestamps: np.ndarray, prices: np.ndarray,
+               volumes: Optional[np.ndarray] = None):
+        """
+        Add many ticks at once, oldest first
+        
+        Args:
+            timestamps: Tick times in epoch seconds, sorted and not earlier than the last tick
+            prices: Tick prices
+            volumes: Traded volumes (NaN or None where unknown)
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = (np.full(len(prices), np.nan) if volumes is None
+                   else np.asarray(volumes, dtype=np.float64))
+        if not len(prices):
+            return
+        if np.any(np.diff(timestamps) < 0) or (self._size and timestamps[0] < self.last_timestamp):
+            raise ValueError("ticks must be appended in time order")
+        
+        # Only the newest ``capacity`` ticks can survive
+        if len(prices) > self.capacity:
+            timestamps, prices, volumes = (column[-self.capacity:] for column in (timestamps, prices, volumes))
+        
+        n = len(prices)
+        while len(self._prices) < min(self.capacity, self._size + n):
+            self._grow()
+        
+        allocated = len(self._prices)
+        positions = (self._start + self._size + np.arange(n)) % allocated
+        self._timestamps[positions] = timestamps
+        self._prices[positions] = prices
+        self._volumes[positions] = volumes
+        
+        overflow = self._size + n - allocated
+        if overflow > 0:
+            self._start = (self._start + overflow) % allocated
+            self._size = allocated
+        else:
+            self._size += n
+    
+    @property
+    def first_timestamp(self) -> float:
+        return float(self._timestamps[self._start])
+    
+    @property
+    def last_timestamp(self) -> float:
+        return float(self._timestamps[(self._start + self._size - 1) % len(self._prices)])
+    
+    @property
+    def last_price(self) -> float:
+        return float(self._prices[(self._start + self._size - 1) % len(self._prices)])
+    
+    def index_at(self, timestamp: float) -> int:
+        """Logical index of the first tick at or after ``timestamp`` (binary search)"""
+        head, tail = self._segments()
+        i = int(np.searchsorted(self._timestamps[head], timestamp, side='left'))
+        if i < head.stop - head.start:
+            return i
+        return i + int(np.searchsorted(self._timestamps[tail], timestamp, side='left'))
+    
+    def window(self, since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Ticks at or after ``since``, oldest first
+        
+        Args:
+            since: Window start in epoch seconds (None for every tick)
+        
+        Returns:
+            Tuple of (timestamps, prices, volumes) arrays; volumes are NaN
+            where unknown. Arrays may share memory with the buffer, so copy
+            them before appending more ticks if they must be kept
+        """
+        start = 0 if since is None else self.index_at(since)
+        return (self._logical(self._timestamps, start),
+                self._logical(self._prices, start),
+                self._logical(self._volumes, start))
+    
+    def drop_before(self, timestamp: float) -> int:
+        """
+        Discard ticks older than ``timestamp``
+        
+        Returns:
+            Number of ticks dropped
+        """
+        if not self._size or self.first_timestamp >= timestamp:
+            return 0
+        
+        dropped = self.index_at(timestamp)
+        self._start = (self._start + dropped) % len(self._prices)
+        self._size -= dropped
+        return dropped
+    
+    def _grow(self):
+        """Reallocate larger storage, unrolling the ring so it starts at index 0"""
+        size = min(self.capacity, 2 * len(self._prices))
+        columns = [self._logical(column, 0) for column in (self._timestamps, self._prices, self._volumes)]
+        self._timestamps, self._prices, self._volumes = (
+            np.concatenate((column, np.empty(size - self._size))) for column in columns
+        )
+        self._start = 0
+    
+    def _segments(self) -> Tuple[slice, slice]:
+        """The buffer's contents as up to two contiguous physical slices"""
+        allocated = len(self._prices)
+        end = self._start + self._size
+        if end <= allocated:
+            return slice(self._start, end), slice(0, 0)
+        return slice(self._start, allocated), slice(0, end - allocated)
+    
+    def _logical(self, column: np.ndarray, start: int) -> np.ndarray:
+        """Column values from logical index ``start`` onwards (a view unless wrapped)"""
+        head, tail = self._segments()
+        head_len = head.stop - head.start
+        if start >= head_len:
+            return column[tail.start + start - head_len:tail.stop]
+        if tail.stop == 0:
+            return column[head.start + start:head.stop]
+        return np.concatenate((column[head.start + start:head.stop], column[tail]))
@@ -5,13 +5,22 @@ Web interface for OTC Front-Running Defense Simulator
 import asyncio
 import json
 import logging
+from contextlib import aclosing
 from datetime import datetime
 from typing import Dict, List
 from aiohttp import web, web_request, ClientTimeout
 from aiohttp.web import middleware
 from jinja2 import Environment, FileSystemLoader
 from simulator.otc_simulator import OTCSimulator
+from simulator.clock import create_clock
 from simulator.config import Config
+from simulator.enhanced_features import HistoricalTracker
+from simulator.history_store import HistoryStore
+from simulator.http_session import HTTPSessionPool
+from simulator.price_cache import PriceCache
+from simulator.price_series import to_json
+from simulator.price_tape import TapeRecorder
+from simulator.streaming import BatchAnalyzer
 from simulator.logger import setup_logger
 
 class WebServer:
@@ -22,6 +31,15 @@ class WebServer:
         self.logger = setup_logger("web_server", config.verbose)
         self.app = web.Application(middlewares=[self.cors_middleware])
         self.jinja_env = Environment(loader=FileSystemLoader('templates'))
+        self.http_pool = HTTPSessionPool(config)
+        self.price_cache = PriceCache.from_config(config) if config.price_cache_enabled else None
+        self.tape_recorder = TapeRecorder.from_config(config)
+        self.history_store = HistoryStore.from_config(config)
+        # One tracker for the server's lifetime, so the insight cache and the
+        # rolling correlation matrix carry over from request to request
+        self.historical_tracker = (HistoricalTracker(config, create_clock(config), self.history_store)
+                                   if config.historical_tracking else None)
+        self.app.on_cleanup.append(self.close_http_pool)
         self.setup_routes()
         self.simulation_results = []
     
@@ -29,11 +47,22 @@ class WebServer:
     async def cors_middleware(self, request, handler):
         """CORS middleware for API endpoints"""
         response = await handler(request)
+        if response.prepared:
+            # Streamed responses set their own headers before sending
+            return response
         response.headers['Access-Control-Allow-Origin'] = '*'
         response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
         response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
         return response
     
+    async def close_http_pool(self, app: web.Application):
+        """Close the shared HTTP session, tape recorder and history store on shutdown"""
+        await self.http_pool.close()
+        if self.tape_recorder:
+            self.tape_recorder.close()
+        if self.history_store:
+            self.history_store.close()
+    
     def setup_routes(self):
         """Setup web routes"""
         # Static files
@@ -46,6 +75,7 @@ class WebServer:
         
         # API endpoints
         self.app.router.add_post('/api/simulate', self.api_simulate)
+        self.app.router.add_post('/api/simulate/stream', self.api_simulate_stream)
         self.app.router.add_get('/api/results', self.api_get_results)
         self.app.router.add_get('/api/config', self.api_get_config)
         self.app.router.add_post('/api/config', self.api_update_config)
@@ -217,30 +247,42 @@ class WebServer:
         """
         return web.Response(text=html, content_type='text/html')
     
+    def _simulation_config(self, data: Dict) -> Config:
+        """Create a simulation config from request data, with enhanced features"""
+        return Config(
+            token=data.get('token', self.config.token),
+            amount=data.get('amount', self.config.amount),
+            delay=data.get('delay', self.config.delay),
+            threshold=data.get('threshold', self.config.threshold),
+            iterations=data.get('iterations', 1),
+            verbose=data.get('verbose', self.config.verbose),
+            concurrency=int(data.get('concurrency', self.config.concurrency)),
+            rate_limit=data.get('rate_limit', self.config.rate_limit),
+            # Enhanced features
+            enable_alerts=data.get('enable_alerts', True),
+            alert_threshold=float(data.get('alert_threshold', 0.02)),
+            historical_tracking=data.get('historical_tracking', True),
+            advanced_risk_scoring=data.get('advanced_risk_scoring', True),
+            batch_tokens=data.get('batch_tokens', ["SOL", "BTC", "ETH", "USDC", "USDT", "BNB", "ADA", "MATIC", "AVAX", "DOT", "LINK", "UNI", "RAY", "SRM", "ORCA", "MNGO"]),
+            custom_delay_periods=data.get('custom_delay_periods', [1.0, 2.0, 3.0, 5.0, 10.0])
+        )
+    
+    def _historical_tracker(self, config: Config):
+        """The server's shared tracker, unless the request turned tracking off"""
+        return self.historical_tracker if config.historical_tracking else None
+    
     async def api_simulate(self, request: web_request.Request):
         """API endpoint to run simulation with enhanced features"""
         try:
             data = await request.json()
             
-            # Create config from request with enhanced features
-            config = Config(
-                token=data.get('token', self.config.token),
-                amount=data.get('amount', self.config.amount),
-                delay=data.get('delay', self.config.delay),
-                threshold=data.get('threshold', self.config.threshold),
-                iterations=data.get('iterations', 1),
-                verbose=data.get('verbose', self.config.verbose),
-                # Enhanced features
-                enable_alerts=data.get('enable_alerts', True),
-                alert_threshold=float(data.get('alert_threshold', 0.02)),
-                historical_tracking=data.get('historical_tracking', True),
-                advanced_risk_scoring=data.get('advanced_risk_scoring', True),
-                batch_tokens=data.get('batch_tokens', ["SOL", "BTC", "ETH", "USDC", "USDT", "BNB", "ADA", "MATIC", "AVAX", "DOT", "LINK", "UNI", "RAY", "SRM", "ORCA", "MNGO"]),
-                custom_delay_periods=data.get('custom_delay_periods', [1.0, 2.0, 3.0, 5.0, 10.0])
-            )
+            config = self._simulation_config(data)
             
             # Run simulation
-            simulator = OTCSimulator(config)
+            simulator = OTCSimulator(config, self.http_pool, self.price_cache,
+                                     tape_recorder=self.tape_recorder,
+                                     history_store=self.history_store,
+                                     historical_tracker=self._historical_tracker(config))
             simulation_type = data.get('simulation_type', 'single')
             
             if simulation_type == 'enhanced_batch':
@@ -250,8 +292,9 @@ class WebServer:
                     'success': True,
                     'results': results,
                     'market_insights': simulator.get_market_insights(),
+                    'insight_cache': simulator.get_insight_cache_stats(),
                     'simulation_type': 'enhanced_batch'
-                })
+                }, dumps=to_json)
             elif simulation_type == 'multi_token':
                 results = await simulator.batch_simulator.run_multi_token_simulation(None)
                 self.simulation_results = results
@@ -259,7 +302,7 @@ class WebServer:
                     'success': True,
                     'results': results,
                     'simulation_type': 'multi_token'
-                })
+                }, dumps=to_json)
             elif simulation_type == 'multi_delay':
                 results = await simulator.batch_simulator.run_multi_delay_simulation(config.token, None)
                 self.simulation_results = results
@@ -267,7 +310,7 @@ class WebServer:
                     'success': True,
                     'results': results,
                     'simulation_type': 'multi_delay'
-                })
+                }, dumps=to_json)
             elif config.iterations == 1:
                 result = await simulator.simulate_otc_trade()
                 self.simulation_results.append(result)
@@ -275,8 +318,9 @@ class WebServer:
                     'success': True,
                     'results': result,
                     'market_insights': simulator.get_market_insights(),
+                    'insight_cache': simulator.get_insight_cache_stats(),
                     'simulation_type': 'single'
-                })
+                }, dumps=to_json)
             else:
                 results = await simulator.run_batch_simulation()
                 self.simulation_results.extend(results)
@@ -286,8 +330,9 @@ class WebServer:
                     'results': results,
                     'analysis': analysis,
                     'market_insights': simulator.get_market_insights(),
+                    'insight_cache': simulator.get_insight_cache_stats(),
                     'simulation_type': 'batch'
-                })
+                }, dumps=to_json)
                 
         except Exception as e:
             self.logger.error(f"Simulation API error: {e}")
@@ -296,6 +341,53 @@ class WebServer:
                 status=500
             )
     
+    async def api_simulate_stream(self, request: web_request.Request):
+        """API endpoint streaming simulation results as NDJSON while they complete"""
+        try:
+            data = await request.json()
+            config = self._simulation_config(data)
+            simulator = OTCSimulator(config, self.http_pool, self.price_cache,
+                                     tape_recorder=self.tape_recorder,
+                                     history_store=self.history_store,
+                                     historical_tracker=self._historical_tracker(config))
+        except Exception as e:
+            return web.json_response({'success': False, 'error': str(e)}, status=400)
+        
+        response = web.StreamResponse(headers={
+            'Content-Type': 'application/x-ndjson',
+            'Access-Control-Allow-Origin': '*'
+        })
+        await response.prepare(request)
+        
+        async def send(line: Dict):
+            # Awaiting the write applies backpressure to the simulation stream
+            await response.write((to_json(line) + '\n').encode())
+        
+        try:
+            if data.get('simulation_type') == 'multi_token':
+                stream = simulator.batch_simulator.stream_multi_token_simulation(None)
+                async with aclosing(stream):
+                    async for token, result in stream:
+                        await send({'token': token, 'result': result})
+            else:
+                analyzer = BatchAnalyzer()
+                stream = simulator.stream_batch_simulation()
+                async with aclosing(stream):
+                    async for result in stream:
+                        analyzer.add(result)
+                        self.simulation_results.append(result)
+                        await send({'result': result})
+                await send({'analysis': analyzer.get_analysis()})
+        except ConnectionResetError:
+            self.logger.info("Client disconnected from simulation stream")
+            return response
+        except Exception as e:
+            self.logger.error(f"Streaming simulation API error: {e}")
+            await send({'error': str(e)})
+        
+        await response.write_eof()
+        return response
+    
     async def api_get_results(self, request: web_request.Request):
         """API endpoint to get simulation results"""
         limit = int(request.query.get('limit', 100))
@@ -304,7 +396,7 @@ class WebServer:
         return web.json_response({
             'results': results,
             'total_count': len(self.simulation_results)
-        })
+        }, dumps=to_json)
     
     async def api_get_config(self, request: web_request.Request):
         """API endpoint to get current configuration"""
@@ -339,7 +431,9 @@ class WebServer:
             'status': 'running',
             'timestamp': datetime.now().isoformat(),
             'total_simulations': len(self.simulation_results),
-            'config': self.config.__dict__
+            'config': self.config.__dict__,
+            'http_pool': self.http_pool.get_stats(),
+            'price_cache': self.price_cache.get_stats() if self.price_cache else None
         })
     
     async def api_sol_price(self, request: web_request.Request):
@@ -355,94 +449,93 @@ class WebServer:
                 return web.json_response(self._price_cache['data'])
         
         try:
-            import aiohttp
+            session = await self.http_pool.get_session()
             
-            async with aiohttp.ClientSession() as session:
-                # Try CoinGecko first (free tier)
-                try:
-                    url = "https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd&include_24hr_change=true"
-                    headers = {
-                        'User-Agent': 'OTC-Simulator/1.0',
-                        'Accept': 'application/json'
-                    }
-                    
-                    timeout = ClientTimeout(total=10)
-                    async with session.get(url, headers=headers, timeout=timeout) as response:
-                        if response.status == 200:
-                            data = await response.json()
+            # Try CoinGecko first (free tier)
+            try:
+                url = "https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd&include_24hr_change=true"
+                headers = {
+                    'User-Agent': 'OTC-Simulator/1.0',
+                    'Accept': 'application/json'
+                }
+                
+                timeout = ClientTimeout(total=10)
+                async with session.get(url, headers=headers, timeout=timeout) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        
+                        if 'solana' in data:
+                            sol_data = data['solana']
+                            price = sol_data.get('usd', 0)
+                            change_24h = sol_data.get('usd_24h_change', 0)
                             
-                            if 'solana' in data:
-                                sol_data = data['solana']
-                                price = sol_data.get('usd', 0)
-                                change_24h = sol_data.get('usd_24h_change', 0)
-                                
-                                result = {
-                                    'success': True,
-                                    'price': price,
-                                    'change_24h': change_24h,
-                                    'source': 'coingecko',
-                                    'timestamp': datetime.now().isoformat()
-                                }
-                                
-                                # Cache the result
-                                if not hasattr(self, '_price_cache'):
-                                    self._price_cache = {}
-                                self._price_cache = {
-                                    'data': result,
-                                    'timestamp': datetime.now().timestamp()
-                                }
-                                
-                                return web.json_response(result)
-                        elif response.status == 429:
-                            self.logger.warning("CoinGecko rate limit hit, trying fallback...")
+                            result = {
+                                'success': True,
+                                'price': price,
+                                'change_24h': change_24h,
+                                'source': 'coingecko',
+                                'timestamp': datetime.now().isoformat()
+                            }
                             
-                except Exception as e:
-                    self.logger.warning(f"CoinGecko failed: {e}, trying fallback...")
-                
-                # Fallback to CryptoCompare API
-                try:
-                    url = "https://min-api.cryptocompare.com/data/price?fsym=SOL&tsyms=USD"
-                    
-                    timeout = ClientTimeout(total=10)
-                    async with session.get(url, timeout=timeout) as response:
-                        if response.status == 200:
-                            data = await response.json()
+                            # Cache the result
+                            if not hasattr(self, '_price_cache'):
+                                self._price_cache = {}
+                            self._price_cache = {
+                                'data': result,
+                                'timestamp': datetime.now().timestamp()
+                            }
                             
-                            if 'USD' in data:
-                                price = data['USD']
-                                
-                                result = {
-                                    'success': True,
-                                    'price': price,
-                                    'change_24h': 0,  # No change data from this API
-                                    'source': 'cryptocompare',
-                                    'timestamp': datetime.now().isoformat()
-                                }
-                                
-                                # Cache the result
-                                if not hasattr(self, '_price_cache'):
-                                    self._price_cache = {}
-                                self._price_cache = {
-                                    'data': result,
-                                    'timestamp': datetime.now().timestamp()
-                                }
-                                
-                                return web.json_response(result)
-                                
-                except Exception as e:
-                    self.logger.warning(f"CryptoCompare failed: {e}")
+                            return web.json_response(result)
+                    elif response.status == 429:
+                        self.logger.warning("CoinGecko rate limit hit, trying fallback...")
+                        
+            except Exception as e:
+                self.logger.warning(f"CoinGecko failed: {e}, trying fallback...")
+            
+            # Fallback to CryptoCompare API
+            try:
+                url = "https://min-api.cryptocompare.com/data/price?fsym=SOL&tsyms=USD"
                 
-                # If both APIs fail, return cached data if available
-                if hasattr(self, '_price_cache') and self._price_cache:
-                    cached_result = self._price_cache['data'].copy()
-                    cached_result['note'] = 'Using cached data due to API limits'
-                    return web.json_response(cached_result)
+                timeout = ClientTimeout(total=10)
+                async with session.get(url, timeout=timeout) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        
+                        if 'USD' in data:
+                            price = data['USD']
+                            
+                            result = {
+                                'success': True,
+                                'price': price,
+                                'change_24h': 0,  # No change data from this API
+                                'source': 'cryptocompare',
+                                'timestamp': datetime.now().isoformat()
+                            }
+                            
+                            # Cache the result
+                            if not hasattr(self, '_price_cache'):
+                                self._price_cache = {}
+                            self._price_cache = {
+                                'data': result,
+                                'timestamp': datetime.now().timestamp()
+                            }
+                            
+                            return web.json_response(result)
+                            
+            except Exception as e:
+                self.logger.warning(f"CryptoCompare failed: {e}")
+            
+            # If both APIs fail, return cached data if available
+            if hasattr(self, '_price_cache') and self._price_cache:
+                cached_result = self._price_cache['data'].copy()
+                cached_result['note'] = 'Using cached data due to API limits'
+                return web.json_response(cached_result)
+            
+            return web.json_response({
+                'success': False,
+                'error': 'All price APIs are currently unavailable'
+            }, status=503)
                 
-                return web.json_response({
-                    'success': False,
-                    'error': 'All price APIs are currently unavailable'
-                }, status=503)
-                    
         except Exception as e:
             self.logger.error(f"Failed to fetch SOL price: {e}")
             return web.json_response({
@@ -462,9 +555,12 @@ class WebServer:
         
         self.logger.info(f"Web server running at http://{host}:{port}")
         
-        # Keep server running
-        while True:
-            await asyncio.sleep(3600)  # Sleep for 1 hour intervals
+        # Keep server running; cleanup closes the shared HTTP session
+        try:
+            while True:
+                await asyncio.sleep(3600)  # Sleep for 1 hour intervals
+        finally:
+            await runner.cleanup()
 
 async def start_web_server(config: Config):
     """Start web server with given configuration"""